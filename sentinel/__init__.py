@@ -9,9 +9,21 @@ __version__ = "0.3.0"
 __author__ = "Dhiraj Das"
 __email__ = "contact@dhirajdas.dev"
 
-from sentinel.core.orchestrator import SentinelOrchestrator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sentinel.core.orchestrator import SentinelOrchestrator
 
 __all__ = [
     "SentinelOrchestrator",
     "__version__",
 ]
+
+
+def __getattr__(name: str):
+    # Imported lazily so light submodules (reporters, replay) don't pull
+    # in Selenium and the full agent stack
+    if name == "SentinelOrchestrator":
+        from sentinel.core.orchestrator import SentinelOrchestrator
+        return SentinelOrchestrator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -288,7 +288,7 @@ def replay(report_dir, step, rerun):
     console.print()
     
     try:
-        from sentinel.reporters.session_replayer import SessionReplayer
+        from sentinel.reporters.session_replayer import SessionReplayer, confidence_bar
         
         replayer = SessionReplayer(report_dir)
         session = replayer.load()
@@ -308,8 +308,7 @@ def replay(report_dir, step, rerun):
         # Print decision timeline
         console.print("[bold]📝 Decision Timeline:[/bold]")
         for i, decision in enumerate(replayer.get_decisions(), 1):
-            conf = decision.confidence
-            conf_bar = "█" * int(conf * 10) + "░" * (10 - int(conf * 10))
+            conf_bar = confidence_bar(decision.confidence)
             target = decision.target[:35] + "..." if decision.target and len(decision.target) > 35 else (decision.target or "N/A")
             console.print(f"  {i}. [{conf_bar}] [cyan]{decision.action.upper()}[/cyan] → {target}")
             if decision.reasoning:
@@ -1,6 +1,20 @@
 """Core module - Orchestrator and driver management."""
 
-from sentinel.core.orchestrator import SentinelOrchestrator
-from sentinel.core.driver_factory import create_driver
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sentinel.core.orchestrator import SentinelOrchestrator
+    from sentinel.core.driver_factory import create_driver
 
 __all__ = ["SentinelOrchestrator", "create_driver"]
+
+
+def __getattr__(name: str):
+    # Imported lazily so helpers like sentinel.core.compat stay cheap
+    if name == "SentinelOrchestrator":
+        from sentinel.core.orchestrator import SentinelOrchestrator
+        return SentinelOrchestrator
+    if name == "create_driver":
+        from sentinel.core.driver_factory import create_driver
+        return create_driver
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
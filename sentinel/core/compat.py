@@ -0,0 +1,10 @@
+"""
+Compatibility helpers for the range of Python versions Sentinel supports.
+"""
+
+import sys
+
+# ``@dataclass(slots=True)`` needs Python 3.10+; on 3.9 this expands to
+# nothing and the dataclass simply keeps its ``__dict__``.
+# Usage: ``@dataclass(**DATACLASS_SLOTS)``
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
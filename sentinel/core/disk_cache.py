@@ -0,0 +1,72 @@
+"""
+Disk Cache - Private per-user directory for derived artifacts.
+
+Parsed replay sessions, rendered summaries and downscaled screenshots are
+cached under the system temp directory. The directory is created per user
+with mode 0700 and is only used when the current user owns it, so other
+local users cannot plant or read cache entries. The number of files is
+bounded; the oldest entries are removed first.
+"""
+
+import logging
+import os
+import stat
+import tempfile
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on cached files; pruning removes the least recently written
+CACHE_MAX_FILES = 256
+
+
+def cache_dir() -> Optional[str]:
+    """
+    Return the current user's cache directory, creating it if needed.
+
+    Returns:
+        Path of the directory, or None if it cannot be created or is not
+        private to the current user (callers then skip caching).
+    """
+    getuid = getattr(os, "getuid", None)
+    uid = getuid() if getuid else None
+    name = "sentinel_cache" if uid is None else f"sentinel_cache-{uid}"
+    path = os.path.join(tempfile.gettempdir(), name)
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.lstat(path)
+    except OSError as e:
+        logger.debug(f"[DiskCache] Cache directory unavailable ({e})")
+        return None
+
+    # Refuse symlinks and directories another user owns or can write to
+    if not stat.S_ISDIR(st.st_mode):
+        logger.debug(f"[DiskCache] Ignoring {path}: not a directory")
+        return None
+    if uid is not None and (st.st_uid != uid or st.st_mode & 0o077):
+        logger.debug(f"[DiskCache] Ignoring {path}: not private to this user")
+        return None
+    return path
+
+
+def prune_cache_dir(path: str, max_files: int = CACHE_MAX_FILES) -> None:
+    """
+    Delete the oldest files in ``path`` beyond ``max_files`` (best effort).
+
+    Args:
+        path: Cache directory returned by cache_dir()
+        max_files: Number of files to keep
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = [(e.stat().st_mtime_ns, e.path) for e in it if e.is_file(follow_symlinks=False)]
+    except OSError:
+        return
+    if len(entries) <= max_files:
+        return
+    entries.sort()
+    for _, file_path in entries[:len(entries) - max_files]:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
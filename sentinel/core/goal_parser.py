@@ -2,6 +2,25 @@ import re
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 
+# Patterns are compiled once at import; parse() runs them for every clause
+_THEN_SPLIT_RE = re.compile(r'\s+(?:and\s+)?then\s+', re.IGNORECASE)
+_AND_SPLIT_RE = re.compile(r'\s+and\s+(?=click|type|enter|input|search|find|verify|navigate|go|open)', re.IGNORECASE)
+_CONTEXT_RE = re.compile(r"(.*?)\s+(?:for|in|associated with|near|of)\s+['\"]?([^'\"].*?)['\"]?$", re.IGNORECASE)
+_QUOTED_RE = re.compile(r"['\"]([^'\"]+)['\"]")
+_VERIFY_RE = re.compile(r"verify\s+(?:that\s+)?(?:the\s+)?(.*)$", re.IGNORECASE)
+_VERIFY_SUFFIX_RE = re.compile(r"\s+(?:exists|appears|is visible|is present|says|matches)$", re.IGNORECASE)
+_VERIFY_PREFIX_RE = re.compile(r"^(?:text|title|heading|header|page|the)\s+", re.IGNORECASE)
+_TYPE_QUOTED_RE = re.compile(r"(?:type|enter|input|search|find|lookup)\s+(?:for\s+)?['\"]([^'\"]+)['\"]\s+(?:in|into|on|the|at)?\s*(.*?)$", re.IGNORECASE)
+_TYPE_UNQUOTED_RE = re.compile(r"(?:search|find|lookup|type|enter)\s+(?:for\s+)?(.*?)(?:\s+(?:in|into|on|the|at)\s+(.*))?$", re.IGNORECASE)
+_CLICK_RE = re.compile(r"click\s+(?:the\s+)?(.*?)$", re.IGNORECASE)
+_NAVIGATE_RE = re.compile(r"(?:navigate|go|open)\s+(?:to\s+)?(https?://\S+)", re.IGNORECASE)
+_CLASS_RE = re.compile(r"class\s*[:\s]\s*([a-zA-Z0-9_-]+)", re.IGNORECASE)
+_ID_RE = re.compile(r"id\s*[:\s]\s*([a-zA-Z0-9_-]+)", re.IGNORECASE)
+_ROLE_RE = re.compile(r"role\s*[:\s]\s*([a-zA-Z0-9_-]+)", re.IGNORECASE)
+_FILLER_RE = re.compile(r"\s+(?:with|the)\s+", re.IGNORECASE)
+_DESCRIPTOR_SUFFIX_RE = re.compile(r"\s+(?:button|link|icon|dropdown|menu|toggle|field|input)$", re.IGNORECASE)
+
+
 @dataclass
 class TargetSpec:
     """Specifications for identifying a target element."""
@@ -59,9 +78,9 @@ class RegexGoalParser:
 
     def parse(self, goal: str) -> ParsedGoal:
         # ... (splitting logic remains same)
-        step_texts = re.split(r'\s+(?:and\s+)?then\s+', goal, flags=re.IGNORECASE)
+        step_texts = _THEN_SPLIT_RE.split(goal)
         if len(step_texts) == 1:
-            step_texts = re.split(r'\s+and\s+(?=click|type|enter|input|search|find|verify|navigate|go|open)', goal, flags=re.IGNORECASE)
+            step_texts = _AND_SPLIT_RE.split(goal)
 
         parsed_steps = []
         for raw_step in step_texts:
@@ -81,7 +100,7 @@ class RegexGoalParser:
         
         # Extract context keyword (X for Y, X in Y, X of Y)
         # Multi-word context support (greedy match until end or reserved keywords)
-        context_match = re.search(r"(.*?)\s+(?:for|in|associated with|near|of)\s+['\"]?([^'\"].*?)['\"]?$", text, re.IGNORECASE)
+        context_match = _CONTEXT_RE.search(text)
         if context_match:
             base_text = context_match.group(1).strip()
             context_hint = context_match.group(2).strip()
@@ -92,9 +111,9 @@ class RegexGoalParser:
         # 1. VERIFY patterns
         # Handle 'verify that X says Y', 'verify heading X counts', etc.
         # Prioritize quoted text as the value
-        quoted_value = re.search(r"['\"]([^'\"]+)['\"]", base_text)
+        quoted_value = _QUOTED_RE.search(base_text)
         
-        verify_match = re.search(r"verify\s+(?:that\s+)?(?:the\s+)?(.*)$", base_text, re.IGNORECASE)
+        verify_match = _VERIFY_RE.search(base_text)
         if verify_match:
             val = verify_match.group(1).strip()
             # If there's quoted text, it's likely the value
@@ -102,9 +121,9 @@ class RegexGoalParser:
                 val = quoted_value.group(1).strip()
             else:
                 # Strip trailing "exists", "appears", etc.
-                val = re.sub(r"\s+(?:exists|appears|is visible|is present|says|matches)$", "", val, flags=re.IGNORECASE).strip()
+                val = _VERIFY_SUFFIX_RE.sub("", val).strip()
                 # Strip leading keywords
-                val = re.sub(r"^(?:text|title|heading|header|page|the)\s+", "", val, flags=re.IGNORECASE).strip()
+                val = _VERIFY_PREFIX_RE.sub("", val).strip()
                 
             return GoalStep(
                 action="verify",
@@ -117,7 +136,7 @@ class RegexGoalParser:
         # 2. TYPE/SEARCH patterns
         # Handle 'type X in Y', 'search for X', 'enter X into Y'
         # Check for quoted first
-        type_match = re.search(r"(?:type|enter|input|search|find|lookup)\s+(?:for\s+)?['\"]([^'\"]+)['\"]\s+(?:in|into|on|the|at)?\s*(.*?)$", base_text, re.IGNORECASE)
+        type_match = _TYPE_QUOTED_RE.search(base_text)
         if type_match:
             return GoalStep(
                 action="type",
@@ -129,7 +148,7 @@ class RegexGoalParser:
             
         # Handle UNQUOTED type/search (last word or after 'for')
         # e.g. "search for Artificial Intelligence" -> val=AI, target=search
-        unquoted_search = re.search(r"(?:search|find|lookup|type|enter)\s+(?:for\s+)?(.*?)(?:\s+(?:in|into|on|the|at)\s+(.*))?$", base_text, re.IGNORECASE)
+        unquoted_search = _TYPE_UNQUOTED_RE.search(base_text)
         if unquoted_search:
             val = unquoted_search.group(1).strip()
             target_raw = unquoted_search.group(2) or "search"
@@ -144,7 +163,7 @@ class RegexGoalParser:
                 )
 
         # 3. CLICK patterns
-        click_match = re.search(r"click\s+(?:the\s+)?(.*?)$", base_text, re.IGNORECASE)
+        click_match = _CLICK_RE.search(base_text)
         if click_match:
             return GoalStep(
                 action="click",
@@ -154,7 +173,7 @@ class RegexGoalParser:
             )
 
         # 4. NAVIGATE patterns
-        nav_match = re.search(r"(?:navigate|go|open)\s+(?:to\s+)?(https?://\S+)", base_text, re.IGNORECASE)
+        nav_match = _NAVIGATE_RE.search(base_text)
         if nav_match:
             return GoalStep(
                 action="navigate",
@@ -177,28 +196,28 @@ class RegexGoalParser:
         spec = TargetSpec()
         
         # Extract class
-        class_match = re.search(r"class\s*[:\s]\s*([a-zA-Z0-9_-]+)", text, re.IGNORECASE)
+        class_match = _CLASS_RE.search(text)
         if class_match:
             spec.css_class = class_match.group(1)
             text = text.replace(class_match.group(0), "")
 
         # Extract ID
-        id_match = re.search(r"id\s*[:\s]\s*([a-zA-Z0-9_-]+)", text, re.IGNORECASE)
+        id_match = _ID_RE.search(text)
         if id_match:
             spec.id = id_match.group(1)
             text = text.replace(id_match.group(0), "")
 
         # Extract Role
-        role_match = re.search(r"role\s*[:\s]\s*([a-zA-Z0-9_-]+)", text, re.IGNORECASE)
+        role_match = _ROLE_RE.search(text)
         if role_match:
             spec.role = role_match.group(1)
             text = text.replace(role_match.group(0), "")
 
         # Remaining text is likely the visible text label
         # Clean up common fluff (World-Class semantic stripping)
-        clean_text = re.sub(r"\s+(?:with|the)\s+", " ", text, flags=re.IGNORECASE).strip()
+        clean_text = _FILLER_RE.sub(" ", text).strip()
         # Strip trailing descriptors like 'button', 'link', 'dropdown'
-        clean_text = re.sub(r"\s+(?:button|link|icon|dropdown|menu|toggle|field|input)$", "", clean_text, flags=re.IGNORECASE).strip()
+        clean_text = _DESCRIPTOR_SUFFIX_RE.sub("", clean_text).strip()
         
         if clean_text:
             spec.text = clean_text.strip("'\" ")
@@ -234,6 +234,7 @@ class SentinelOrchestrator:
         start_time = datetime.now()
         decisions: List[Decision] = []
         error_msg: Optional[str] = None
+        report_path: Optional[str] = None
         
         try:
             # Navigate to target URL
@@ -320,8 +321,8 @@ class SentinelOrchestrator:
                     self._step_blacklist = [] # Clear blacklist for new step
                     
                     if self._parsed_goal.is_completed:
-                        report_path = self._recorder.generate_report()
                         self._recorder.log_info("✨ Goal Achieved! Generating final report.")
+                        report_path = self._recorder.generate_report()
                         return ExecutionResult(
                         success=True,
                         goal=self.config.goal,
@@ -341,7 +342,9 @@ class SentinelOrchestrator:
             error_msg = str(e)
         
         finally:
-            report_path = self._recorder.generate_report()
+            # The success path has already written the report
+            if report_path is None:
+                report_path = self._recorder.generate_report()
         
         return ExecutionResult(
             success=False,
@@ -699,6 +702,13 @@ class SentinelOrchestrator:
                 pass
             self._driver = None
         
+        # Flush the recorder's buffered NDJSON sidecar and release its handle
+        if self._recorder:
+            try:
+                self._recorder.close()
+            except Exception:
+                pass
+        
         self._initialized = False
     
     def __enter__(self) -> "SentinelOrchestrator":
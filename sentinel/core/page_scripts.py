@@ -0,0 +1,70 @@
+"""
+Page Scripts - Persistent JavaScript helpers installed in the browser.
+
+Large detection scripts are installed once as ``window.__sentinel*``
+functions so that each check only sends a short call over WebDriver.
+Chromium drivers get them on every new document via CDP; other drivers
+(or documents loaded before registration) get them injected on demand.
+"""
+
+import threading
+import weakref
+from typing import Any, Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+# Registration outcome per driver and script source, so analyzers, mappers
+# and mutators built on the same session add each script only once
+_registered: "weakref.WeakKeyDictionary[Any, Dict[str, bool]]" = weakref.WeakKeyDictionary()
+_registered_lock = threading.Lock()
+
+
+def register_page_script(driver: "WebDriver", source: str) -> bool:
+    """
+    Pre-install a script on every new document via CDP.
+    
+    Each script is registered at most once per driver; repeated calls
+    return the first outcome without another CDP round trip.
+    
+    Returns:
+        False when the driver has no CDP support; callers then rely on
+        call_page_function() to inject the script lazily.
+    """
+    with _registered_lock:
+        try:
+            scripts = _registered.setdefault(driver, {})
+        except TypeError:
+            # Not weak-referenceable or hashable: register without memoizing
+            scripts = {}
+        if source in scripts:
+            return scripts[source]
+    
+    # The CDP round trip runs outside the lock so other sessions are not blocked
+    try:
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument", {"source": source}
+        )
+        registered = True
+    except Exception:
+        registered = False
+    with _registered_lock:
+        scripts[source] = registered
+    return registered
+
+
+def call_page_function(driver: "WebDriver", call_js: str, installer_js: str, *args: Any) -> Any:
+    """
+    Call an installed page function, injecting it first if it is missing.
+    
+    Args:
+        driver: WebDriver instance
+        call_js: Script that returns null when the function is not installed
+        installer_js: Script that installs the function on ``window``
+        *args: Arguments passed through to ``call_js``
+    """
+    result = driver.execute_script(call_js, *args)
+    if result is None:
+        driver.execute_script(installer_js)
+        result = driver.execute_script(call_js, *args)
+    return result
@@ -6,15 +6,345 @@ element map that any AI agent can use for decision-making.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, ClassVar, Dict, FrozenSet, List, Optional, Tuple, TYPE_CHECKING
 import hashlib
 
+from sentinel.core.compat import DATACLASS_SLOTS
+from sentinel.core.page_scripts import call_page_function, register_page_script
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 if TYPE_CHECKING:
     from selenium.webdriver.remote.webdriver import WebDriver
     from selenium.webdriver.remote.webelement import WebElement
 
 
-@dataclass
+def _short_hash(value: str) -> str:
+    """
+    Build a short element ID from a signature string.
+    
+    IDs only need to be collision-resistant within a page, so a fast
+    non-cryptographic hash (xxh3) is used when xxhash is installed.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(value.encode())[:12]
+    return hashlib.md5(value.encode()).hexdigest()[:12]
+
+
+# Vectorized element mapper. Installs ``window.__sentinelMap`` so each
+# scan only ships a short call (_CALL_MAPPER_JS) instead of the full source.
+_UNIFIED_MAPPER_JS = r"""
+window.__sentinelMap = function(selector) {
+    const elements = document.querySelectorAll(selector);
+
+    const isVisible = (el) => {
+        if (el.checkVisibility) return el.checkVisibility();
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+
+    // nth-of-type per child, computed once per parent for the whole scan
+    const nthIndex = new WeakMap();
+    const nthOfType = (el) => {
+        const parent = el.parentNode;
+        if (!parent) return 1;
+        let index = nthIndex.get(parent);
+        if (!index) {
+            index = new Map();
+            const counts = new Map();
+            for (const child of parent.children) {
+                const n = (counts.get(child.tagName) || 0) + 1;
+                counts.set(child.tagName, n);
+                index.set(child, n);
+            }
+            nthIndex.set(parent, index);
+        }
+        return index.get(el) || 1;
+    };
+
+    const getStableSelector = (el) => {
+        if (el.id) {
+            if (!/^\d/.test(el.id)) return '#' + CSS.escape(el.id);
+            return '[id="' + CSS.escape(el.id) + '"]';
+        }
+        const dataAttrs = ['data-testid', 'data-id', 'data-automation'];
+        for (let attr of dataAttrs) {
+            let val = el.getAttribute(attr);
+            if (val) return '[' + attr + '="' + CSS.escape(val) + '"]';
+        }
+    
+        // Robust CSS Path Fallback
+        try {
+            const path = [];
+            let cur = el;
+            while (cur && cur.nodeType === Node.ELEMENT_NODE && cur.tagName !== 'HTML') {
+                let selector = cur.tagName.toLowerCase();
+                if (cur.id && !/^\d/.test(cur.id)) {
+                    selector += '#' + CSS.escape(cur.id);
+                    path.unshift(selector);
+                    break;
+                }
+            
+                selector += `:nth-of-type(${nthOfType(cur)})`;
+                path.unshift(selector);
+                cur = cur.parentElement;
+            }
+            return path.join(' > ');
+        } catch (e) {
+            return el.tagName.toLowerCase();
+        }
+    };
+
+    const getSemanticEnclosure = (el) => {
+        let contextParts = [];
+        let depth = 0;
+        const maxDepth = 10;
+    
+        // 1. Check Preceding Siblings (Proximity Bonding)
+        // Often Titles are siblings just above the button/card
+        let sib = el.previousElementSibling;
+        while (sib && contextParts.length < 5) {
+            const text = (sib.innerText || "").trim();
+            if (text.length > 2 && text.length < 200) {
+                if (!contextParts.includes(text)) contextParts.push(text);
+            }
+            sib = sib.previousElementSibling;
+        }
+
+        // 2. Check Ancestor Hierarchy (Standard Bonding)
+        let cur = el.parentElement;
+        while (cur && cur.tagName !== 'BODY' && depth < maxDepth) {
+            // Find significant text labels in this container
+            const labels = Array.from(cur.querySelectorAll('h1,h2,h3,h4,h5,h6,strong,b,legend,label,span,p,div'))
+                .filter(node => {
+                    const text = (node.innerText || "").trim();
+                    return text.length > 2 && text.length < 200 && node !== el && !node.contains(el);
+                })
+                .map(node => (node.innerText || "").trim());
+        
+            labels.forEach(l => {
+                if (!contextParts.includes(l)) contextParts.push(l);
+            });
+        
+            // Also check preceding siblings of the container (Grid Sibling Bonding)
+            let pSib = cur.previousElementSibling;
+            while (pSib && contextParts.length < 10) {
+                const pText = (pSib.innerText || "").trim();
+                if (pText.length > 2 && pText.length < 200) {
+                    if (!contextParts.includes(pText)) contextParts.push(pText);
+                }
+                pSib = pSib.previousElementSibling;
+            }
+
+            cur = cur.parentElement;
+            depth++;
+        }
+        return contextParts.join(" | ");
+    };
+
+    // Headings already matched by the selector are shipped once. Dedupe on
+    // the nodes themselves: stable selectors are not unique when a page
+    // repeats an id or data-testid
+    const seen = new Set();
+    const results = [];
+    let visibleCount = 0;
+    for (const el of elements) {
+        if (visibleCount >= 1000) break;
+        if (!isVisible(el)) continue;
+        visibleCount++;
+        seen.add(el);
+        const selector = getStableSelector(el);
+
+        const rect = el.getBoundingClientRect();
+        const attrs = {};
+        for (let attr of ['id', 'class', 'role', 'name', 'href', 'aria-label', 'placeholder']) {
+            let val = el.getAttribute(attr);
+            if (val) attrs[attr] = val.substring(0, 150);
+        }
+        results.push({
+            tag: el.tagName.toLowerCase(),
+            text: (el.innerText || "").substring(0, 200).trim(),
+            selector: selector,
+            context: getSemanticEnclosure(el),
+            rect: { x: rect.left, y: rect.top, width: rect.width, height: rect.height },
+            attributes: attrs
+        });
+    }
+
+    // Add semantic landmarks that might have been missed by strict selector
+    const headers = document.querySelectorAll('h1, h2, h3, h4, h5, h6');
+    headers.forEach(h => {
+        if (seen.has(h) || !isVisible(h)) return;
+        seen.add(h);
+        const selector = getStableSelector(h);
+        const rect = h.getBoundingClientRect();
+        results.push({
+            tag: h.tagName.toLowerCase(),
+            text: (h.innerText || "").substring(0, 200).trim(),
+            selector: selector,
+            context: "Heading",
+            rect: { x: rect.left, y: rect.top, width: rect.width, height: rect.height },
+            attributes: { id: h.id, class: h.className }
+        });
+    });
+
+    return results;
+};
+"""
+
+# Invokes the mapper installed by _UNIFIED_MAPPER_JS
+_CALL_MAPPER_JS = (
+    "return window.__sentinelMap ? window.__sentinelMap(arguments[0]) : null;"
+)
+
+# Recursive Shadow DOM traversal; returns the interactive elements found
+# within shadow roots (plus concise light-DOM text blocks).
+_DEEP_SHADOW_JS = r"""
+const results = [];
+const seen = new Set();
+const isYoutube = window.location.hostname.includes('youtube');
+
+// Blocklist
+const ignoreTags = new Set(['script', 'style', 'noscript', 'meta', 'link', 'title', 'head', 'html', 'body']);
+
+// Standard interactive tags + Semantic Landmarks
+const baseTags = ['a', 'button', 'input', 'select', 'textarea', 'details', 'summary', 'iframe', 'canvas', 'video', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'];
+const youtubeTags = ['yt-formatted-string', 'ytd-thumbnail', 'ytd-video-renderer', 'ytd-rich-grid-media', 'span', 'h3', 'div'];
+
+const interactiveTags = new Set(baseTags);
+if (isYoutube) {
+    youtubeTags.forEach(t => interactiveTags.add(t));
+}
+
+function getPath(el) {
+    let path = [];
+    let cur = el;
+    while (cur) {
+        if (cur.nodeType === Node.ELEMENT_NODE) {
+            let selector = cur.tagName.toLowerCase();
+            if (cur.id) selector += '#' + cur.id;
+            else if (cur.classList.length > 0) selector += '.' + cur.classList[0]; 
+            path.unshift(selector);
+        }
+        if (cur.parentNode && cur.parentNode.nodeType === Node.DOCUMENT_FRAGMENT_NODE) {
+            cur = cur.parentNode.host;
+            path.unshift('>>');
+        } else {
+            cur = cur.parentNode;
+        }
+    }
+    return path.join(' ').replace(/ >> /g, ' >> ');
+}
+
+function isVisible(el) {
+    const rect = el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) return false;
+    const style = window.getComputedStyle(el);
+    return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0';
+}
+
+function processNode(node) {
+    if (!node || seen.has(node)) return;
+    
+    const tag = node.tagName.toLowerCase();
+    if (ignoreTags.has(tag)) return;
+    
+    let shouldMap = false;
+    
+    // 1. Interactive Tag?
+    if (interactiveTags.has(tag)) shouldMap = true;
+    
+    // 2. Interactive Attributes?
+    if (node.hasAttribute('onclick') || node.getAttribute('role') === 'button' || node.getAttribute('role') === 'link') shouldMap = true;
+    
+    // 3. TEXT-BASED DISCOVERY (Semantic/Verification Targets)
+    // We need to see text to verify goals (e.g. "Verify the header says...")
+    const textContent = (node.innerText || "").trim();
+    if (textContent.length > 0) {
+        // Always map headers
+        if (/^h[1-6]$/.test(tag)) {
+            shouldMap = true;
+        }
+        // Map significant but concise text blocks (likely verification targets)
+        else if (textContent.length > 2 && textContent.length < 500) {
+            // Only map if it's a relative leaf (don't map large containers that just happen to have text)
+            if (node.children.length < 3) {
+                 shouldMap = true;
+            }
+        }
+    }
+    
+    // 4. YouTube specific overrides (redundant now but kept for specificity)
+    if (isYoutube && node.id === 'video-title') shouldMap = true;
+    
+    if (shouldMap && isVisible(node)) {
+        seen.add(node);
+        
+        const attrs = {};
+        for (let attr of ['id', 'class', 'role', 'name', 'href', 'title', 'aria-label']) {
+            let val = node.getAttribute(attr);
+            if (val) attrs[attr] = val.substring(0, 100);
+        }
+        
+        const rect = node.getBoundingClientRect();
+        
+        results.push({
+            tag: tag,
+            text: (node.innerText || "").trim().substring(0, 200),
+            path: getPath(node),
+            context: "", 
+            rect: {x: rect.x, y: rect.y, width: rect.width, height: rect.height},
+            attributes: attrs
+        });
+    }
+}
+
+function findAllElements(root) {
+    if (!root) return;
+    
+    // Direct processing
+    if (root.nodeType === Node.ELEMENT_NODE) {
+        processNode(root);
+        if (root.shadowRoot) {
+            findAllElements(root.shadowRoot);
+        }
+    }
+
+    // Children processing
+    const children = root.children || root.childNodes;
+    for (let i = 0; i < children.length; i++) {
+        const node = children[i];
+        if (node.nodeType === Node.ELEMENT_NODE) {
+            findAllElements(node);
+        }
+    }
+}
+
+// --- ENTRY POINT ---
+findAllElements(document.body);
+
+// Targeted Re-Entry for YouTube specific hosts (just in case)
+if (isYoutube) {
+    const hosts = document.querySelectorAll('ytd-app, ytd-masthead, ytd-page-manager, ytd-browse, ytd-search, ytd-video-renderer, ytd-thumbnail');
+    hosts.forEach(host => {
+        if (host.shadowRoot) {
+            findAllElements(host.shadowRoot);
+        }
+    });
+}
+
+return results.slice(0, 1500); 
+"""
+
+
+# Attributes worth showing an LLM in ElementNode.__str__
+_PROMPT_ATTRIBUTES = frozenset({"id", "class", "name", "type", "placeholder"})
+
+
+@dataclass(**DATACLASS_SLOTS)
 class ElementNode:
     """
     Represents an interactive element in the World State.
@@ -33,10 +363,17 @@ class ElementNode:
     is_interactive: bool = True
     element_type: str = "standard"  # "standard", "shadow", "canvas"
     context_text: str = "" # Surrounding text context for disambiguation
+    # Memoized __str__ output; nodes are not modified once mapped
+    _prompt_str: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        return {
+    def to_dict(self, skip_empty: bool = False) -> Dict[str, Any]:
+        """
+        Convert to dictionary for serialization.
+        
+        Args:
+            skip_empty: Drop fields that are None or empty (smaller prompts)
+        """
+        data = {
             "id": self.id,
             "tag": self.tag,
             "text": self.text,
@@ -49,11 +386,19 @@ class ElementNode:
             "element_type": self.element_type,
             "context_text": self.context_text,
         }
+        if skip_empty:
+            return {k: v for k, v in data.items() if v is not None and v != "" and v != {}}
+        return data
     
     def __str__(self) -> str:
         """Human-readable representation for LLM prompts."""
+        if self._prompt_str is None:
+            self._prompt_str = self._format_prompt_str()
+        return self._prompt_str
+    
+    def _format_prompt_str(self) -> str:
         text_preview = self.text[:50] + "..." if len(self.text) > 50 else self.text
-        attrs = ", ".join(f'{k}="{v}"' for k, v in self.attributes.items() if k in ["id", "class", "name", "type", "placeholder"])
+        attrs = ", ".join(f'{k}="{v}"' for k, v in self.attributes.items() if k in _PROMPT_ATTRIBUTES)
         context = f" [Context: {self.context_text[:30]}]" if self.context_text else ""
         return f"<{self.tag} {attrs}>{text_preview}</{self.tag}>{context}"
 
@@ -73,17 +418,27 @@ class DOMMapper:
     """
     
     # Elements that are typically interactive
-    INTERACTIVE_TAGS = [
+    INTERACTIVE_TAGS: ClassVar[FrozenSet[str]] = frozenset({
         "a", "button", "input", "select", "textarea",
         "label", "option", "details", "summary",
         "h1", "h2", "h3", "h4", "h5", "h6",
-    ]
+    })
     
     # Attributes that indicate interactivity
-    INTERACTIVE_ATTRIBUTES = [
+    INTERACTIVE_ATTRIBUTES: ClassVar[FrozenSet[str]] = frozenset({
         "onclick", "onchange", "onsubmit", "href",
         "role", "tabindex", "contenteditable",
-    ]
+    })
+    
+    # CSS selector passed to the mapper, built once (sorted for a stable string)
+    _INTERACTIVE_SELECTOR: ClassVar[str] = (
+        ", ".join(sorted(INTERACTIVE_TAGS))
+        + ", [onclick], [onchange], [role='button'], [role='link'], [tabindex]"
+    )
+    
+    # Fast-path checks used by _element_to_node
+    _INTERACTIVE_HINT_ATTRS: ClassVar[Tuple[str, ...]] = ("onclick", "href", "role")
+    _INTERACTIVE_ROLES: ClassVar[FrozenSet[str]] = frozenset({"button", "link", "checkbox", "tab"})
     
     def __init__(self, driver: "WebDriver"):
         """
@@ -93,7 +448,13 @@ class DOMMapper:
             driver: Selenium WebDriver (optionally wrapped with lumos)
         """
         self.driver = driver
+        # Capability probes are resolved once; the driver does not change
         self._has_lumos = self._check_lumos_support()
+        self._has_find_all_shadow = hasattr(driver, "find_all_shadow")
+        # Last mapped world state and its lazily built lookup index
+        self._world_state: Optional[List[ElementNode]] = None
+        self._text_index: Optional[Tuple[Dict[str, ElementNode], List[Tuple[str, ElementNode]]]] = None
+        register_page_script(driver, _UNIFIED_MAPPER_JS)
     
     def _check_lumos_support(self) -> bool:
         """Check if the driver has Shadow DOM support via lumos."""
@@ -122,34 +483,29 @@ class DOMMapper:
         if self._has_lumos:
             elements.extend(self._map_shadow_elements())
         
-        # Deduplicate by ID
-        seen_ids = set()
-        unique_elements = []
-        for elem in elements:
-            if elem.id not in seen_ids:
-                seen_ids.add(elem.id)
-                unique_elements.append(elem)
-        
-        return unique_elements
+        # Deduplicate by ID (dicts keep first-insertion order)
+        self._world_state = list({elem.id: elem for elem in elements}.values())
+        self._text_index = None
+        return self._world_state
     
     def _map_standard_dom(self) -> List[ElementNode]:
         """Map all interactive elements in the standard DOM using a single JS pass."""
         elements: List[ElementNode] = []
         
-        # Build selector for interactive elements
-        selector = ", ".join(self.INTERACTIVE_TAGS)
-        selector += ", [onclick], [onchange], [role='button'], [role='link'], [tabindex]"
+        selector = self._INTERACTIVE_SELECTOR
         
         try:
-            # Execute unified mapper script
-            script = self._get_unified_mapper_script()
-            results = self.driver.execute_script(script, selector)
+            # Call the pre-installed mapper; inject it first if this document
+            # was loaded before registration (or CDP is unavailable)
+            results = call_page_function(
+                self.driver, _CALL_MAPPER_JS, _UNIFIED_MAPPER_JS, selector
+            )
             
             for idx, res in enumerate(results):
                 try:
                     # Generate unique ID in Python
                     unique_str = f"{res['tag']}_{res['attributes'].get('id', '')}_{res['attributes'].get('class', '')}_{res['text'][:20]}_{idx}"
-                    element_id = hashlib.md5(unique_str.encode()).hexdigest()[:12]
+                    element_id = _short_hash(unique_str)
                     
                     node = ElementNode(
                         id=element_id,
@@ -173,150 +529,14 @@ class DOMMapper:
             try:
                 web_elements = self.driver.find_elements("css selector", selector)
                 for idx, elem in enumerate(web_elements):
-                    node = self._element_to_node(elem, idx)
-                    if node and node.is_visible:
+                    node = self._element_to_node(elem, idx, skip_hidden=True)
+                    if node:
                         elements.append(node)
             except Exception:
                 pass
         
         return elements
 
-    def _get_unified_mapper_script(self) -> str:
-        """Get the JavaScript for vectorized element mapping."""
-        return r"""
-        const selector = arguments[0];
-        const elements = document.querySelectorAll(selector);
-        
-        const isVisible = (el) => {
-            if (el.checkVisibility) return el.checkVisibility();
-            const rect = el.getBoundingClientRect();
-            return rect.width > 0 && rect.height > 0;
-        };
-
-        const getStableSelector = (el) => {
-            if (el.id) {
-                if (!/^\d/.test(el.id)) return '#' + CSS.escape(el.id);
-                return '[id="' + CSS.escape(el.id) + '"]';
-            }
-            const dataAttrs = ['data-testid', 'data-id', 'data-automation'];
-            for (let attr of dataAttrs) {
-                let val = el.getAttribute(attr);
-                if (val) return '[' + attr + '="' + CSS.escape(val) + '"]';
-            }
-            
-            // Robust CSS Path Fallback
-            try {
-                const path = [];
-                let cur = el;
-                while (cur && cur.nodeType === Node.ELEMENT_NODE && cur.tagName !== 'HTML') {
-                    let selector = cur.tagName.toLowerCase();
-                    if (cur.id && !/^\d/.test(cur.id)) {
-                        selector += '#' + CSS.escape(cur.id);
-                        path.unshift(selector);
-                        break;
-                    }
-                    
-                    let sibling = cur;
-                    let nth = 1;
-                    while (sibling = sibling.previousElementSibling) {
-                        if (sibling.tagName.toLowerCase() === selector) nth++;
-                    }
-                    selector += `:nth-of-type(${nth})`;
-                    path.unshift(selector);
-                    cur = cur.parentElement;
-                }
-                return path.join(' > ');
-            } catch (e) {
-                return el.tagName.toLowerCase();
-            }
-        };
-
-        const getSemanticEnclosure = (el) => {
-            let contextParts = [];
-            let depth = 0;
-            const maxDepth = 10;
-            
-            // 1. Check Preceding Siblings (Proximity Bonding)
-            // Often Titles are siblings just above the button/card
-            let sib = el.previousElementSibling;
-            while (sib && contextParts.length < 5) {
-                const text = (sib.innerText || "").trim();
-                if (text.length > 2 && text.length < 200) {
-                    if (!contextParts.includes(text)) contextParts.push(text);
-                }
-                sib = sib.previousElementSibling;
-            }
-
-            // 2. Check Ancestor Hierarchy (Standard Bonding)
-            let cur = el.parentElement;
-            while (cur && cur.tagName !== 'BODY' && depth < maxDepth) {
-                // Find significant text labels in this container
-                const labels = Array.from(cur.querySelectorAll('h1,h2,h3,h4,h5,h6,strong,b,legend,label,span,p,div'))
-                    .filter(node => {
-                        const text = (node.innerText || "").trim();
-                        return text.length > 2 && text.length < 200 && node !== el && !node.contains(el);
-                    })
-                    .map(node => (node.innerText || "").trim());
-                
-                labels.forEach(l => {
-                    if (!contextParts.includes(l)) contextParts.push(l);
-                });
-                
-                // Also check preceding siblings of the container (Grid Sibling Bonding)
-                let pSib = cur.previousElementSibling;
-                while (pSib && contextParts.length < 10) {
-                    const pText = (pSib.innerText || "").trim();
-                    if (pText.length > 2 && pText.length < 200) {
-                        if (!contextParts.includes(pText)) contextParts.push(pText);
-                    }
-                    pSib = pSib.previousElementSibling;
-                }
-
-                cur = cur.parentElement;
-                depth++;
-            }
-            return contextParts.join(" | ");
-        };
-
-        const results = Array.from(elements)
-            .filter(isVisible)
-            .slice(0, 1000)
-            .map(el => {
-                const rect = el.getBoundingClientRect();
-                const attrs = {};
-                for (let attr of ['id', 'class', 'role', 'name', 'href', 'aria-label', 'placeholder']) {
-                    let val = el.getAttribute(attr);
-                    if (val) attrs[attr] = val.substring(0, 150);
-                }
-                return {
-                    tag: el.tagName.toLowerCase(),
-                    text: (el.innerText || "").substring(0, 200).trim(),
-                    selector: getStableSelector(el),
-                    context: getSemanticEnclosure(el),
-                    rect: { x: rect.left, y: rect.top, width: rect.width, height: rect.height },
-                    attributes: attrs
-                };
-            });
-
-        // Add semantic landmarks that might have been missed by strict selector
-        const headers = document.querySelectorAll('h1, h2, h3, h4, h5, h6');
-        headers.forEach(h => {
-            if (isVisible(h) && !results.some(r => r.selector === getStableSelector(h))) {
-                 const rect = h.getBoundingClientRect();
-                 results.push({
-                    tag: h.tagName.toLowerCase(),
-                    text: (h.innerText || "").substring(0, 200).trim(),
-                    selector: getStableSelector(h),
-                    context: "Heading",
-                    rect: { x: rect.left, y: rect.top, width: rect.width, height: rect.height },
-                    attributes: { id: h.id, class: h.className }
-                 });
-            }
-        });
-
-        return results;
-        """
-    
     def _map_shadow_elements(self) -> List[ElementNode]:
         """
         Map elements inside Shadow DOMs using lumos.
@@ -331,14 +551,13 @@ class DOMMapper:
         try:
             # Execute Deep Shadow DOM Walker
             # This traverses the entire shadow tree recursively in one go
-            script = self._get_deep_shadow_script()
-            results = self.driver.execute_script(script)
+            results = self.driver.execute_script(_DEEP_SHADOW_JS)
             
             for idx, res in enumerate(results):
                 try:
                      # Generate unique ID
                     unique_str = f"shadow_{res['tag']}_{res['attributes'].get('id', '')}_{res['text'][:20]}_{idx}"
-                    element_id = hashlib.md5(unique_str.encode()).hexdigest()[:12]
+                    element_id = _short_hash(unique_str)
                     
                     node = ElementNode(
                         id=element_id,
@@ -372,177 +591,6 @@ class DOMMapper:
         
         return elements
     
-    def _find_shadow_hosts(self) -> List["WebElement"]:
-        """Find all elements that have shadow roots."""
-        # Execute JavaScript to find all shadow hosts
-        script = """
-        const hosts = [];
-        const walker = document.createTreeWalker(
-            document.body,
-            NodeFilter.SHOW_ELEMENT,
-            null,
-            false
-        );
-        
-        let node;
-        while (node = walker.nextNode()) {
-            if (node.shadowRoot) {
-                hosts.push(node);
-            }
-        }
-        return hosts;
-        """
-        
-        try:
-            return self.driver.execute_script(script)
-        except Exception:
-            return []
-    
-        return elements
-    
-    def _get_deep_shadow_script(self) -> str:
-        """
-        Get the JavaScript for recursive Shadow DOM traversal.
-        Returns a list of interactive elements found within shadow roots.
-        """
-        return r"""
-        const results = [];
-        const seen = new Set();
-        const isYoutube = window.location.hostname.includes('youtube');
-        
-        // Blocklist
-        const ignoreTags = new Set(['script', 'style', 'noscript', 'meta', 'link', 'title', 'head', 'html', 'body']);
-        
-        // Standard interactive tags + Semantic Landmarks
-        const baseTags = ['a', 'button', 'input', 'select', 'textarea', 'details', 'summary', 'iframe', 'canvas', 'video', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'];
-        const youtubeTags = ['yt-formatted-string', 'ytd-thumbnail', 'ytd-video-renderer', 'ytd-rich-grid-media', 'span', 'h3', 'div'];
-        
-        const interactiveTags = new Set(baseTags);
-        if (isYoutube) {
-            youtubeTags.forEach(t => interactiveTags.add(t));
-        }
-        
-        function getPath(el) {
-            let path = [];
-            let cur = el;
-            while (cur) {
-                if (cur.nodeType === Node.ELEMENT_NODE) {
-                    let selector = cur.tagName.toLowerCase();
-                    if (cur.id) selector += '#' + cur.id;
-                    else if (cur.classList.length > 0) selector += '.' + cur.classList[0]; 
-                    path.unshift(selector);
-                }
-                if (cur.parentNode && cur.parentNode.nodeType === Node.DOCUMENT_FRAGMENT_NODE) {
-                    cur = cur.parentNode.host;
-                    path.unshift('>>');
-                } else {
-                    cur = cur.parentNode;
-                }
-            }
-            return path.join(' ').replace(/ >> /g, ' >> ');
-        }
-        
-        function isVisible(el) {
-            const rect = el.getBoundingClientRect();
-            if (rect.width === 0 || rect.height === 0) return false;
-            const style = window.getComputedStyle(el);
-            return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0';
-        }
-
-        function processNode(node) {
-            if (!node || seen.has(node)) return;
-            
-            const tag = node.tagName.toLowerCase();
-            if (ignoreTags.has(tag)) return;
-            
-            let shouldMap = false;
-            
-            // 1. Interactive Tag?
-            if (interactiveTags.has(tag)) shouldMap = true;
-            
-            // 2. Interactive Attributes?
-            if (node.hasAttribute('onclick') || node.getAttribute('role') === 'button' || node.getAttribute('role') === 'link') shouldMap = true;
-            
-            // 3. TEXT-BASED DISCOVERY (Semantic/Verification Targets)
-            // We need to see text to verify goals (e.g. "Verify the header says...")
-            const textContent = (node.innerText || "").trim();
-            if (textContent.length > 0) {
-                // Always map headers
-                if (/^h[1-6]$/.test(tag)) {
-                    shouldMap = true;
-                }
-                // Map significant but concise text blocks (likely verification targets)
-                else if (textContent.length > 2 && textContent.length < 500) {
-                    // Only map if it's a relative leaf (don't map large containers that just happen to have text)
-                    if (node.children.length < 3) {
-                         shouldMap = true;
-                    }
-                }
-            }
-            
-            // 4. YouTube specific overrides (redundant now but kept for specificity)
-            if (isYoutube && node.id === 'video-title') shouldMap = true;
-            
-            if (shouldMap && isVisible(node)) {
-                seen.add(node);
-                
-                const attrs = {};
-                for (let attr of ['id', 'class', 'role', 'name', 'href', 'title', 'aria-label']) {
-                    let val = node.getAttribute(attr);
-                    if (val) attrs[attr] = val.substring(0, 100);
-                }
-                
-                const rect = node.getBoundingClientRect();
-                
-                results.push({
-                    tag: tag,
-                    text: (node.innerText || "").trim().substring(0, 200),
-                    path: getPath(node),
-                    context: "", 
-                    rect: {x: rect.x, y: rect.y, width: rect.width, height: rect.height},
-                    attributes: attrs
-                });
-            }
-        }
-
-        function findAllElements(root) {
-            if (!root) return;
-            
-            // Direct processing
-            if (root.nodeType === Node.ELEMENT_NODE) {
-                processNode(root);
-                if (root.shadowRoot) {
-                    findAllElements(root.shadowRoot);
-                }
-            }
-
-            // Children processing
-            const children = root.children || root.childNodes;
-            for (let i = 0; i < children.length; i++) {
-                const node = children[i];
-                if (node.nodeType === Node.ELEMENT_NODE) {
-                    findAllElements(node);
-                }
-            }
-        }
-        
-        // --- ENTRY POINT ---
-        findAllElements(document.body);
-        
-        // Targeted Re-Entry for YouTube specific hosts (just in case)
-        if (isYoutube) {
-            const hosts = document.querySelectorAll('ytd-app, ytd-masthead, ytd-page-manager, ytd-browse, ytd-search, ytd-video-renderer, ytd-thumbnail');
-            hosts.forEach(host => {
-                if (host.shadowRoot) {
-                    findAllElements(host.shadowRoot);
-                }
-            });
-        }
-
-        return results.slice(0, 1500); 
-        """
-    
-    
     def _map_youtube_fallback(self) -> List[ElementNode]:
         """
         Python-side fallback for YouTube using Lumos, Native Selenium, AND Visual Guard.
@@ -556,7 +604,7 @@ class DOMMapper:
         for attempt in range(max_retries):
             try:
                 # 1. Try Lumos (Layer 1: Pierce)
-                if hasattr(self.driver, "find_all_shadow"):
+                if self._has_find_all_shadow:
                     print(f"⚡ Lumos Scan (Attempt {attempt+1}/{max_retries})...")
                     renderers = self.driver.find_all_shadow("ytd-video-renderer")
                     # Also try specific title spans which might be easier to target
@@ -608,7 +656,7 @@ class DOMMapper:
                 if text and len(text) > 3:
                      # Generate unique ID
                     unique_str = f"yt_fallback_{idx}_{text[:20]}"
-                    element_id = hashlib.md5(unique_str.encode()).hexdigest()[:12]
+                    element_id = _short_hash(unique_str)
                     
                     print(f"   -> Fallback Candidate: '{text[:40]}...'")
                     
@@ -650,7 +698,7 @@ class DOMMapper:
             for idx, block in enumerate(text_blocks):
                 if len(block.text) < 5: continue
                 
-                element_id = hashlib.md5(f"vis_{idx}_{block.text}".encode()).hexdigest()[:12]
+                element_id = _short_hash(f"vis_{idx}_{block.text}")
                 node = ElementNode(
                     id=element_id,
                     tag="visual-block",
@@ -677,12 +725,32 @@ class DOMMapper:
         element: "WebElement",
         index: int,
         shadow_path: Optional[str] = None,
-        element_type: str = "standard"
+        element_type: str = "standard",
+        *,
+        assume_visible: Optional[bool] = None,
+        skip_hidden: bool = False,
     ) -> Optional[ElementNode]:
-        """Convert a Selenium WebElement to an ElementNode."""
+        """
+        Convert a Selenium WebElement to an ElementNode.
+        
+        Args:
+            assume_visible: Visibility already known (e.g. from a JS pass that
+                filtered with checkVisibility); skips the is_displayed() round-trip
+            skip_hidden: Return None for hidden elements before fetching
+                attributes, saving their round-trips
+        """
         try:
+            # Check visibility
+            if assume_visible is not None:
+                is_visible = assume_visible
+            else:
+                is_visible = element.is_displayed()
+            if skip_hidden and not is_visible:
+                return None
+            
             tag = element.tag_name
-            text = element.text.strip() if element.text else ""
+            text = element.text
+            text = text.strip() if text else ""
             
             # Get key attributes
             attrs = {}
@@ -694,14 +762,11 @@ class DOMMapper:
                 except Exception:
                     pass
             
-            # Check visibility
-            is_visible = element.is_displayed()
-            
             # Check if interactive
             is_interactive = (
                 tag in self.INTERACTIVE_TAGS or
-                any(attr in attrs for attr in ["onclick", "href", "role"]) or
-                attrs.get("role") in ["button", "link", "checkbox", "tab"]
+                any(attr in attrs for attr in self._INTERACTIVE_HINT_ATTRS) or
+                attrs.get("role") in self._INTERACTIVE_ROLES
             )
             
             # Get bounding box
@@ -738,8 +803,12 @@ class DOMMapper:
                     const el = arguments[0];
                     if (!el) return {selector: "", context: ""};
 
-                    // --- A. SELECTOR GENERATION ---
                     // --- A. SELECTOR GENERATION (Robust & Stable) ---
+                    const STATE_RE = /hover|active|focus|selected/;
+                    // Heading-like nodes, matched natively instead of filtering querySelectorAll('*')
+                    const HEADING_SEL = 'h1,h2,h3,h4,h5,h6,strong,b,legend,summary,[role="heading"],'
+                        + '[class*="title" i],[class*="header" i],[class*="heading" i],'
+                        + '[class*="name" i],[class*="label" i]';
                     const getStableSelector = (el) => {
                         if (el.id && !/^\d/.test(el.id)) return '#' + el.id;
                         
@@ -753,9 +822,23 @@ class DOMMapper:
                                 break;
                             }
                             // Use classes as secondary stabilizers
+                            // (char scan: no per-ancestor RegExp/array allocation)
                             if (cur.className && typeof cur.className === 'string') {
-                                const classes = cur.className.trim().split(/\s+/).filter(c => !c.match(/hover|active|focus|selected/));
-                                if (classes.length > 0) part += '.' + classes[0];
+                                const cn = cur.className;
+                                const len = cn.length;
+                                let i = 0;
+                                while (i < len) {
+                                    while (i < len && cn.charCodeAt(i) <= 32) i++;
+                                    const start = i;
+                                    while (i < len && cn.charCodeAt(i) > 32) i++;
+                                    if (i > start) {
+                                        const cls = cn.substring(start, i);
+                                        if (!STATE_RE.test(cls)) {
+                                            part += '.' + cls;
+                                            break;
+                                        }
+                                    }
+                                }
                             }
                             
                             let sib = cur, nth = 1;
@@ -780,30 +863,22 @@ class DOMMapper:
                         if (aria) breadcrumbs.push(aria);
                         
                         // 2. Traversal for Titles & Containers
-                        const isHeading = (node) => {
-                            const tag = node.tagName;
-                            if (/H[1-6]/.test(tag)) return true;
-                            if (['STRONG', 'B', 'LEGEND', 'SUMMARY'].includes(tag)) return true;
-                            if (node.getAttribute('role') === 'heading') return true;
-                            const cls = (node.className || "").toString().toLowerCase();
-                            return !!cls.match(/title|header|heading|name|label/);
-                        };
-
                         let cur = el.parentElement;
                         let seenTexts = new Set();
                         while (cur && cur.tagName !== 'BODY' && breadcrumbs.length < 3) {
                             // Check for headings within or above the container
-                            const headings = Array.from(cur.querySelectorAll('*'))
-                                .filter(h => isHeading(h) && (h.compareDocumentPosition(el) & Node.DOCUMENT_POSITION_FOLLOWING))
-                                .map(h => h.innerText.trim())
-                                .filter(t => t.length > 2 && t.length < 100);
-                            
-                            if (headings.length > 0) {
-                                const h = headings[headings.length - 1];
+                            // Walk backwards so only the nearest preceding heading pays for innerText
+                            const nodes = cur.querySelectorAll(HEADING_SEL);
+                            for (let k = nodes.length - 1; k >= 0; k--) {
+                                const node = nodes[k];
+                                if (!(node.compareDocumentPosition(el) & Node.DOCUMENT_POSITION_FOLLOWING)) continue;
+                                const h = node.innerText.trim();
+                                if (h.length <= 2 || h.length >= 100) continue;
                                 if (!seenTexts.has(h)) {
                                     breadcrumbs.unshift(h);
                                     seenTexts.add(h);
                                 }
+                                break;
                             }
                             
                             // Check for data-attributes (often used in modern frameworks for context)
@@ -835,7 +910,7 @@ class DOMMapper:
             
             # Generate unique ID
             unique_str = f"{tag}_{attrs.get('id', '')}_{attrs.get('class', '')}_{text[:20]}_{index}"
-            element_id = hashlib.md5(unique_str.encode()).hexdigest()[:12]
+            element_id = _short_hash(unique_str)
             
             return ElementNode(
                 id=element_id,
@@ -853,29 +928,61 @@ class DOMMapper:
         except Exception:
             return None
     
-    def find_by_text(self, text: str) -> Optional[ElementNode]:
-        """Find an element by its visible text content."""
-        world_state = self.get_world_state()
+    def find_by_text(self, text: str, refresh: bool = True) -> Optional[ElementNode]:
+        """
+        Find an element by its visible text content.
+        
+        Args:
+            text: Text to look for (case-insensitive; exact match wins)
+            refresh: Re-map the page first. Pass False for repeated lookups
+                against the last mapped world state.
+        """
+        if refresh or self._world_state is None:
+            self.get_world_state()
+        
+        if self._text_index is None:
+            lowered = [(node.text.lower(), node) for node in self._world_state]
+            # Reverse so the first node wins for duplicate texts
+            exact = {t: node for t, node in reversed(lowered)}
+            self._text_index = (exact, lowered)
+        exact, lowered = self._text_index
+        
+        needle = text.lower()
         
         # Exact match first
-        for node in world_state:
-            if node.text.lower() == text.lower():
-                return node
+        node = exact.get(needle)
+        if node is not None:
+            return node
         
         # Partial match
-        for node in world_state:
-            if text.lower() in node.text.lower():
+        for node_text, node in lowered:
+            if needle in node_text:
                 return node
         
         return None
     
-    def find_by_role(self, role: str) -> List[ElementNode]:
-        """Find all elements with a specific role."""
-        world_state = self.get_world_state()
-        return [
-            node for node in world_state
-            if node.attributes.get("role") == role or node.tag == role
-        ]
+    def find_by_role(
+        self, role: str, limit: Optional[int] = None, refresh: bool = True
+    ) -> List[ElementNode]:
+        """
+        Find all elements with a specific role.
+        
+        Args:
+            role: ARIA role or tag name to match
+            limit: Stop after this many matches (None for all)
+            refresh: Re-map the page first; False reuses the last world state
+        """
+        if refresh or self._world_state is None:
+            self.get_world_state()
+        
+        matches = []
+        for node in self._world_state:
+            if node.attributes.get("role") == role or node.tag == role:
+                matches.append(node)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+    
     def get_page_snapshot(self) -> str:
         """
         Produce a lightweight hash of the current page state.
@@ -886,17 +993,22 @@ class DOMMapper:
             url = self.driver.current_url
             elements = self.get_world_state()
             
-            # Combine signals
+            # Stream signals straight into the hash (same bytes as joining
+            # "url|count|tag:classes:text_len|..." without building the string)
             # Use URL, element count, and structural signals from top elements
-            signals = [url, str(len(elements))]
+            digest = xxhash.xxh3_64() if xxhash is not None else hashlib.md5()
+            digest.update(url.encode())
+            digest.update(b"|")
+            digest.update(str(len(elements)).encode())
             for elem in elements[:20]: # Check more elements
                 # Use tag and classes as they are more structurally stable than text
-                classes = elem.attributes.get("class", "")
-                # Only use first few chars of text to avoid dynamic updates (timers, etc.)
-                text_len = str(len(elem.text)) 
-                signals.append(f"{elem.tag}:{classes}:{text_len}")
-            
-            combined = "|".join(signals)
-            return hashlib.md5(combined.encode()).hexdigest()
+                # Only use text length to avoid dynamic updates (timers, etc.)
+                digest.update(b"|")
+                digest.update(elem.tag.encode())
+                digest.update(b":")
+                digest.update(elem.attributes.get("class", "").encode())
+                digest.update(b":")
+                digest.update(str(len(elem.text)).encode())
+            return digest.hexdigest()
         except Exception:
             return "unknown_state"
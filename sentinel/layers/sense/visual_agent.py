@@ -7,12 +7,27 @@ visual understanding of UI state when DOM analysis is insufficient.
 
 import logging
 import os
+import re
 import base64
+import hashlib
+import mmap
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional, Tuple, Dict, Any, List
 from dataclasses import dataclass
 
+from sentinel.core.disk_cache import cache_dir, prune_cache_dir
+
 logger = logging.getLogger(__name__)
 
+# First number in a VLM answer (confidence score)
+_DIGITS_RE = re.compile(r"\d+")
+
+# Position keywords in VLM answers; the lookahead also reports overlapping hits
+_POSITION_RE = re.compile(r"(?=(top|bottom|middle|center|left|right))", re.IGNORECASE)
+
 
 @dataclass
 class VisualElement:
@@ -25,6 +40,41 @@ class VisualElement:
     confidence: float
 
 
+def _dhash(image) -> int:
+    """64-bit difference hash: 9x8 grayscale thumbnail, one bit per horizontal gradient."""
+    small = image.convert("L").resize((9, 8))
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(8):
+        offset = row * 9
+        for col in range(8):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+@lru_cache(maxsize=64)
+def _file_dhash(path: str, mtime_ns: int, size: int) -> int:
+    """dHash of an image file; mtime/size are part of the key so rewrites miss."""
+    from PIL import Image
+    
+    with Image.open(path) as image:
+        return _dhash(image)
+
+
+def _stat_dhash(path: str) -> int:
+    """Cached dHash lookup for a screenshot path."""
+    st = os.stat(path)
+    return _file_dhash(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+# Hamming weight: native int.bit_count on Python 3.10+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
 class VisualAgent:
     """
     Bridge to Vision-Language Models (VLM) for UI analysis.
@@ -43,17 +93,62 @@ class VisualAgent:
         >>> element = agent.find_element("screenshot.png", "the login button")
     """
     
-    def __init__(self, backend: str = "auto"):
+    # Weight formats accepted by the ``quantization`` argument
+    QUANTIZATION_MODES = ("fp16", "bf16", "int8", "int4")
+    
+    # Encoded screenshots kept for repeat queries on the same image
+    ENC_CACHE_SIZE = 16
+    
+    # Longest screenshot side sent to a VLM (Moondream itself works at ~378px)
+    MAX_IMAGE_DIM = 768
+    
+    # Decoder calls made at load time when compile_model is enabled
+    COMPILE_WARMUP_RUNS = 2
+    
+    # Moondream2 internals that answer_question runs on every query (vision
+    # encoder, prompt prefill, per-token decode), with their compile modes.
+    # answer_question never goes through the wrapper's forward().
+    COMPILE_TARGETS: Tuple[Tuple[str, Optional[str]], ...] = (
+        ("_vis_enc", None),
+        ("_prefill", None),
+        ("_decode_one_tokens", "reduce-overhead"),
+    )
+    
+    # dHash bits (of 64) that must differ before verify_action trusts a
+    # screen change and skips the describe/describe/compare pipeline
+    HASH_CHANGED_THRESHOLD = 32
+    
+    def __init__(
+        self,
+        backend: str = "auto",
+        quantization: Optional[str] = None,
+        compile_model: bool = False,
+    ):
         """
         Initialize the VisualAgent.
         
         Args:
             backend: VLM backend to use ('moondream', 'openai', 'mock', 'auto')
+            quantization: Reduced-precision weights for Moondream2
+                ('fp16', 'bf16', 'int8', 'int4'). int8/int4 need CUDA and
+                bitsandbytes; on CPU, 'bf16' is the better-supported half format.
+                None keeps the default (fp16 on CUDA, fp32 on CPU).
+            compile_model: torch.compile the Moondream2 vision encoder and
+                decoder steps. Slower first load, faster per-token decoding.
         """
+        if quantization is not None and quantization not in self.QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unknown quantization '{quantization}', expected one of {self.QUANTIZATION_MODES}"
+            )
         self.backend = backend.lower()
+        self.quantization = quantization
+        self.compile_model = compile_model
         self._model = None
         self._processor = None
         self._device = None
+        self._openai_client = None
+        # (abspath, mtime_ns, size) -> Moondream image embedding, LRU ordered
+        self._enc_cache: "OrderedDict[Tuple[str, int, int], Any]" = OrderedDict()
         
         if self.backend == "auto":
             self.backend = self._detect_best_backend()
@@ -89,10 +184,22 @@ class VisualAgent:
             return self._load_moondream()
             
         if self.backend == "openai":
-            return True  # No model to load, uses API
+            return self._init_openai_client()
             
         return False
     
+    def _init_openai_client(self) -> bool:
+        """Create the shared OpenAI client (one connection pool for all queries)."""
+        if self._openai_client is None:
+            try:
+                import openai
+                self._openai_client = openai.OpenAI()
+            except Exception as e:
+                # _openai_query reports the failure per call
+                logger.error(f"[VisualAgent] Failed to create OpenAI client: {e}")
+                return False
+        return True
+    
     def _load_moondream(self) -> bool:
         """Load the Moondream2 model."""
         try:
@@ -106,12 +213,17 @@ class VisualAgent:
             
             self._device = "cuda" if torch.cuda.is_available() else "cpu"
             
-            self._model = AutoModelForCausalLM.from_pretrained(
+            load_kwargs = self._moondream_load_kwargs(torch)
+            model = AutoModelForCausalLM.from_pretrained(
                 model_id,
                 trust_remote_code=True,
                 revision=revision,
-                torch_dtype=torch.float16 if self._device == "cuda" else torch.float32,
-            ).to(self._device)
+                **load_kwargs,
+            )
+            # bitsandbytes places quantized weights itself
+            if "quantization_config" not in load_kwargs:
+                model = model.to(self._device)
+            self._model = model
             
             self._processor = AutoTokenizer.from_pretrained(
                 model_id,
@@ -119,6 +231,9 @@ class VisualAgent:
                 revision=revision,
             )
             
+            if self.compile_model:
+                self._compile_moondream(torch)
+            
             logger.info(f"[VisualAgent] Moondream2 loaded on {self._device}")
             return True
             
@@ -127,6 +242,70 @@ class VisualAgent:
             self.backend = "mock"
             return False
     
+    def _compile_moondream(self, torch) -> None:
+        """Compile the encoder and decoder steps and warm them up so the first real query is fast."""
+        if not hasattr(torch, "compile"):
+            logger.warning("[VisualAgent] torch.compile needs PyTorch 2.0+; skipping")
+            return
+        
+        # The HF wrapper keeps the generation code on its inner MoondreamModel
+        inner = getattr(self._model, "model", self._model)
+        targets = [(name, mode) for name, mode in self.COMPILE_TARGETS if callable(getattr(inner, name, None))]
+        if not targets:
+            logger.warning("[VisualAgent] Moondream2 revision has no compilable decoder steps; skipping")
+            return
+        
+        eager = {name: getattr(inner, name) for name, _ in targets}
+        try:
+            from PIL import Image
+            
+            for name, mode in targets:
+                kwargs = {"mode": mode} if mode else {}
+                setattr(inner, name, torch.compile(eager[name], dynamic=False, **kwargs))
+            
+            # Pay the compilation cost at load time, not on the first describe_state
+            blank = Image.new("RGB", (378, 378), "white")
+            enc_image = self._model.encode_image(blank)
+            for _ in range(self.COMPILE_WARMUP_RUNS):
+                self._model.answer_question(enc_image, "Describe this image.", self._processor)
+            logger.info(f"[VisualAgent] Moondream2 compiled ({', '.join(eager)})")
+        except Exception as e:
+            for name, fn in eager.items():
+                setattr(inner, name, fn)
+            logger.warning(f"[VisualAgent] torch.compile failed, using eager mode: {e}")
+    
+    def _moondream_load_kwargs(self, torch) -> Dict[str, Any]:
+        """Build from_pretrained() dtype/quantization kwargs for the current device."""
+        on_cuda = self._device == "cuda"
+        mode = self.quantization
+        
+        if mode in ("int8", "int4"):
+            if on_cuda:
+                from transformers import BitsAndBytesConfig
+                
+                if mode == "int8":
+                    config = BitsAndBytesConfig(load_in_8bit=True)
+                else:
+                    config = BitsAndBytesConfig(
+                        load_in_4bit=True,
+                        bnb_4bit_compute_dtype=torch.float16,
+                    )
+                return {"quantization_config": config, "device_map": {"": 0}}
+            logger.warning(
+                f"[VisualAgent] {mode} quantization needs CUDA; loading unquantized on CPU"
+            )
+        
+        if mode == "bf16":
+            return {"torch_dtype": torch.bfloat16}
+        if mode == "fp16" and not on_cuda:
+            logger.warning(
+                "[VisualAgent] float16 on CPU has limited kernel support; "
+                "quantization='bf16' is usually faster"
+            )
+        if on_cuda or mode == "fp16":
+            return {"torch_dtype": torch.float16}
+        return {"torch_dtype": torch.float32}
+    
     def describe_state(self, screenshot_path: str) -> str:
         """
         Analyze a screenshot and describe the UI state.
@@ -214,9 +393,34 @@ class VisualAgent:
         if self.backend == "mock":
             return 0.85  # Optimistic mock
         
+        if self.backend not in ("moondream", "openai"):
+            return 0.5
+        
+        # Cheap perceptual check first: many actions can be settled without the VLM
+        change = self._screen_change(before_path, after_path)
+        if change is not None:
+            distance, identical = change
+            if identical:
+                return 0.0  # Nothing changed on screen
+            if distance > self.HASH_CHANGED_THRESHOLD:
+                # Clearly a different screen: one direct question is enough
+                prompt = (
+                    f'This screenshot was taken after the action "{action_description}". '
+                    "Did the action succeed? Rate confidence from 0 to 100."
+                )
+                return self._parse_confidence(self._query(after_path, prompt))
+        
         # For now, use a simple approach: describe both and compare
-        before_desc = self.describe_state(before_path)
-        after_desc = self.describe_state(after_path)
+        if self.backend == "openai":
+            # Independent network calls: overlap them instead of waiting twice
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                before_future = pool.submit(self.describe_state, before_path)
+                after_future = pool.submit(self.describe_state, after_path)
+                before_desc = before_future.result()
+                after_desc = after_future.result()
+        else:
+            before_desc = self.describe_state(before_path)
+            after_desc = self.describe_state(after_path)
         
         # Ask the VLM to compare
         prompt = f"""Compare these two UI states:
@@ -225,34 +429,95 @@ AFTER: {after_desc}
 
 Did the action "{action_description}" succeed? Rate confidence from 0 to 100."""
         
-        if self.backend == "moondream":
-            response = self._moondream_query(after_path, prompt)
-        elif self.backend == "openai":
-            response = self._openai_query(after_path, prompt)
-        else:
-            return 0.5
+        return self._parse_confidence(self._query(after_path, prompt))
+    
+    def verify_actions_batch(self, triples: List[Tuple[str, str, str]]) -> List[float]:
+        """
+        Verify several actions, preparing all screenshots in parallel first.
         
-        # Parse confidence from response
+        Args:
+            triples: (before_path, after_path, action_description) per action.
+        
+        Returns:
+            Confidence scores in the same order as ``triples``.
+        """
+        if self.backend in ("moondream", "openai"):
+            paths = {
+                path
+                for before, after, _ in triples
+                for path in (before, after)
+                if os.path.exists(path)
+            }
+            if paths:
+                # Pillow releases the GIL while decoding, so threads overlap well
+                workers = min(len(paths), os.cpu_count() or 1)
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    list(pool.map(self._warm_screenshot, paths))
+        
+        return [self.verify_action(before, after, desc) for before, after, desc in triples]
+    
+    def _warm_screenshot(self, image_path: str) -> None:
+        """Precompute the per-file work verify_action needs (hash, upload copy)."""
+        try:
+            _stat_dhash(image_path)
+        except Exception:
+            pass
+        if self.backend == "openai":
+            self._prepare_image(image_path)
+    
+    def _query(self, image_path: str, prompt: str) -> str:
+        """Send a prompt about one image to the active VLM backend."""
+        if self.backend == "moondream":
+            return self._moondream_query(image_path, prompt)
+        return self._openai_query(image_path, prompt)
+    
+    @staticmethod
+    def _parse_confidence(response: str) -> float:
+        """Parse a 0-100 confidence from a VLM response into 0.0-1.0."""
         try:
-            import re
-            numbers = re.findall(r'\d+', response)
-            if numbers:
-                confidence = min(100, max(0, int(numbers[0]))) / 100.0
+            match = _DIGITS_RE.search(response)
+            if match:
+                confidence = min(100, max(0, int(match.group()))) / 100.0
                 return confidence
-        except:
+        except (ValueError, IndexError):
             pass
         
         return 0.5  # Default medium confidence
     
-    def _moondream_query(self, image_path: str, prompt: str) -> str:
-        """Query the Moondream model."""
+    def _screen_change(self, before_path: str, after_path: str) -> Optional[Tuple[int, bool]]:
+        """
+        Compare two screenshots with a 64-bit difference hash (dHash).
+        
+        Returns:
+            (hamming_distance, pixel_identical), or None if Pillow is not
+            available or an image cannot be read.
+        """
         try:
-            from PIL import Image
+            # Hashes are cached per file: an action's "after" shot is usually
+            # the next action's "before" shot
+            distance = _popcount(_stat_dhash(before_path) ^ _stat_dhash(after_path))
+            if distance:
+                return distance, False
             
-            image = Image.open(image_path)
+            from PIL import Image, ImageChops
             
-            # Encode the image
-            enc_image = self._model.encode_image(image)
+            # dHash is coarse: small edits (typed text) can keep it equal
+            with Image.open(before_path) as before, Image.open(after_path) as after:
+                before = before.convert("RGB")
+                after = after.convert("RGB")
+                identical = (
+                    before.size == after.size
+                    and ImageChops.difference(before, after).getbbox() is None
+                )
+                return distance, identical
+        except Exception:
+            return None
+    
+    def _moondream_query(self, image_path: str, prompt: str) -> str:
+        """Query the Moondream model."""
+        try:
+            # Encode the image (the vision tower is skipped for cached screenshots)
+            enc_image = self._encode_image_cached(image_path)
             
             # Generate response
             response = self._model.answer_question(enc_image, prompt, self._processor)
@@ -263,19 +528,79 @@ Did the action "{action_description}" succeed? Rate confidence from 0 to 100."""
             logger.error(f"[VisualAgent] Moondream query failed: {e}")
             return f"Error: {e}"
     
-    def _openai_query(self, image_path: str, prompt: str) -> str:
-        """Query OpenAI GPT-4o Vision."""
+    def _encode_image_cached(self, image_path: str) -> Any:
+        """
+        Encode a screenshot with Moondream, reusing earlier encodings.
+        
+        The key uses path, mtime and size from os.stat, so an overwritten
+        screenshot is re-encoded without hashing any pixels.
+        """
+        st = os.stat(image_path)
+        key = (os.path.abspath(image_path), st.st_mtime_ns, st.st_size)
+        
+        enc_image = self._enc_cache.get(key)
+        if enc_image is not None:
+            self._enc_cache.move_to_end(key)
+            return enc_image
+        
+        from PIL import Image
+        
+        # Decode once straight to RGB, downscaled, and release the file handle
+        with Image.open(image_path) as image:
+            image = image.convert("RGB")
+            image.thumbnail((self.MAX_IMAGE_DIM, self.MAX_IMAGE_DIM), Image.BILINEAR)
+            enc_image = self._model.encode_image(image)
+        
+        self._enc_cache[key] = enc_image
+        if len(self._enc_cache) > self.ENC_CACHE_SIZE:
+            self._enc_cache.popitem(last=False)
+        return enc_image
+    
+    def _prepare_image(self, image_path: str, max_dim: Optional[int] = None) -> str:
+        """
+        Get a downscaled JPEG copy of a screenshot for upload.
+        
+        Copies are cached in the per-user cache directory (see
+        sentinel.core.disk_cache), keyed on the source's path, mtime and
+        size. Falls back to the original path when Pillow is unavailable,
+        the image cannot be converted or there is no usable cache directory.
+        """
+        max_dim = max_dim or self.MAX_IMAGE_DIM
         try:
-            import openai
+            st = os.stat(image_path)
+            key = f"{os.path.abspath(image_path)}:{st.st_mtime_ns}:{st.st_size}:{max_dim}"
+            directory = cache_dir()
+            if directory is None:
+                return image_path
+            cached = os.path.join(directory, hashlib.sha1(key.encode()).hexdigest() + ".jpg")
+            if os.path.exists(cached):
+                return cached
+            
             from PIL import Image
-            import io
             
-            # Read and encode image
-            with open(image_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode("utf-8")
+            with Image.open(image_path) as image:
+                image = image.convert("RGB")
+                image.thumbnail((max_dim, max_dim), Image.BILINEAR)
+                # Write then rename so concurrent queries never read a partial file
+                partial = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+                image.save(partial, "JPEG", quality=85)
+            os.replace(partial, cached)
+            prune_cache_dir(directory)
+            return cached
+        except Exception as e:
+            logger.debug(f"[VisualAgent] Sending original screenshot ({e})")
+            return image_path
+    
+    def _openai_query(self, image_path: str, prompt: str) -> str:
+        """Query OpenAI GPT-4o Vision."""
+        if not self._init_openai_client():
+            return "Error: OpenAI client unavailable"
+        try:
+            upload_path = self._prepare_image(image_path)
+            mime = "image/jpeg" if upload_path.endswith(".jpg") else "image/png"
+            image_data = self._read_base64(upload_path)
             
-            client = openai.OpenAI()
-            response = client.chat.completions.create(
+            response = self._openai_client.chat.completions.create(
                 model="gpt-4o",
                 messages=[
                     {
@@ -284,7 +609,7 @@ Did the action "{action_description}" succeed? Rate confidence from 0 to 100."""
                             {"type": "text", "text": prompt},
                             {
                                 "type": "image_url",
-                                "image_url": {"url": f"data:image/png;base64,{image_data}"}
+                                "image_url": {"url": f"data:{mime};base64,{image_data}"}
                             }
                         ]
                     }
@@ -298,6 +623,17 @@ Did the action "{action_description}" succeed? Rate confidence from 0 to 100."""
             logger.error(f"[VisualAgent] OpenAI query failed: {e}")
             return f"Error: {e}"
     
+    @staticmethod
+    def _read_base64(image_path: str) -> str:
+        """Base64-encode a file's raw bytes, memory-mapped to skip a read copy."""
+        with open(image_path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    return base64.b64encode(view).decode("ascii")
+            except ValueError:
+                # Empty files cannot be mapped
+                return base64.b64encode(f.read()).decode("ascii")
+    
     def _mock_describe(self) -> str:
         """Return a mock description for testing."""
         return """Web page UI analysis:
@@ -309,23 +645,24 @@ Did the action "{action_description}" succeed? Rate confidence from 0 to 100."""
     def _parse_element_response(self, response: str, description: str) -> Optional[VisualElement]:
         """Parse VLM response to extract element location."""
         # This is a simplified parser - real implementation would be more robust
-        response_lower = response.lower()
+        # One scan collects every position keyword (substring semantics kept)
+        found = {m.group(1).lower() for m in _POSITION_RE.finditer(response)}
         
         # Estimate position from keywords
         x, y = 400, 300  # Default center
         
-        if "top" in response_lower:
+        if "top" in found:
             y = 100
-        elif "bottom" in response_lower:
+        elif "bottom" in found:
             y = 600
-        elif "middle" in response_lower or "center" in response_lower:
+        elif "middle" in found or "center" in found:
             y = 350
             
-        if "left" in response_lower:
+        if "left" in found:
             x = 100
-        elif "right" in response_lower:
+        elif "right" in found:
             x = 700
-        elif "center" in response_lower:
+        elif "center" in found:
             x = 400
         
         return VisualElement(
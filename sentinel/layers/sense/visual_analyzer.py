@@ -7,13 +7,144 @@ an LLM for visual analysis.
 """
 
 from dataclasses import dataclass
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+import json
 import re
 
+from sentinel.core.page_scripts import call_page_function, register_page_script
+
 if TYPE_CHECKING:
     from selenium.webdriver.remote.webdriver import WebDriver
 
 
+# Overlay, spinner, captcha, error and load-state checks fused into one
+# function so is_blocked()/get_visual_state() cost a single WebDriver
+# round-trip. Installed once per page as
+# window.__sentinelProbe(checkCaptcha, checkErrors); the selector lists are
+# filled in from VisualAnalyzer's class constants.
+_PROBE_INSTALLER_JS = r"""
+window.__sentinelProbe = function(checkCaptcha, checkErrors) {
+    const overlaySelectors = __OVERLAY_SELECTORS__;
+    const spinnerSelectors = __SPINNER_SELECTORS__;
+    const errorSelectors = __ERROR_SELECTORS__;
+    const probe = {
+        overlay: null,
+        spinner: null,
+        captcha: null,
+        error: null,
+        readyState: document.readyState,
+        jqueryActive: 0,
+    };
+
+    // 1. Modal overlays
+    overlayScan:
+    for (const selector of overlaySelectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            if (el.offsetParent !== null) {
+                const rect = el.getBoundingClientRect();
+                if (rect.width > 100 && rect.height > 100) {
+                    probe.overlay = 'Modal overlay: ' + selector;
+                    break overlayScan;
+                }
+            }
+        }
+    }
+
+    // Quick check for full-screen fixed overlays
+    if (!probe.overlay) {
+        const fixed = document.querySelectorAll('[style*="position: fixed"], [style*="position:fixed"]');
+        for (const el of fixed) {
+            const rect = el.getBoundingClientRect();
+            if (rect.width > window.innerWidth * 0.8 && rect.height > window.innerHeight * 0.8) {
+                const style = window.getComputedStyle(el);
+                if (style.display !== 'none' && style.visibility !== 'hidden') {
+                    probe.overlay = 'Full-screen overlay';
+                    break;
+                }
+            }
+        }
+    }
+
+    // 2. Loading spinners
+    spinnerScan:
+    for (const selector of spinnerSelectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            if (el.offsetParent !== null) {
+                probe.spinner = 'Spinner: ' + selector;
+                break spinnerScan;
+            }
+        }
+    }
+
+    // 3. Captcha challenges (only needed when nothing else blocks)
+    if (checkCaptcha && !probe.overlay && !probe.spinner) {
+        // One alternation per scan instead of a substring test per pattern;
+        // the i flag avoids lowercased copies of src/title/body text
+        const highRe = /recaptcha|hcaptcha|g-recaptcha|cf-turnstile|arkose/i;
+        const mediumRe = /verify you're human|not a robot|security check required/i;
+
+        for (const s of document.querySelectorAll('script[src]')) {
+            const src = s.src;
+            if (highRe.test(src)) {
+                probe.captcha = 'Captcha script: ' + src.substring(0, 50);
+                break;
+            }
+        }
+
+        if (!probe.captcha) {
+            for (const f of document.querySelectorAll('iframe')) {
+                if (highRe.test(f.src) || highRe.test(f.title)) {
+                    probe.captcha = 'Captcha iframe';
+                    break;
+                }
+            }
+        }
+
+        if (!probe.captcha && document.body) {
+            const text = document.body.innerText;
+            // Limit text-heavy false positives
+            if (text.length < 5000 && mediumRe.test(text)) {
+                probe.captcha = 'Captcha text';
+            }
+        }
+    }
+
+    // 4. Visible error messages (same rules as WebElement.is_displayed,
+    // without a round-trip per candidate)
+    if (checkErrors) {
+        const isShown = (el) => {
+            const rect = el.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) return false;
+            if (el.checkVisibility) {
+                return el.checkVisibility({visibilityProperty: true, checkVisibilityCSS: true});
+            }
+            const style = window.getComputedStyle(el);
+            return style.display !== 'none' && style.visibility !== 'hidden';
+        };
+        for (const el of document.querySelectorAll(errorSelectors.join(', '))) {
+            if (isShown(el)) {
+                probe.error = errorSelectors.find(s => el.matches(s)) || errorSelectors[0];
+                break;
+            }
+        }
+    }
+
+    // 5. Pending AJAX requests (jQuery)
+    try {
+        probe.jqueryActive = typeof jQuery !== 'undefined' ? jQuery.active : 0;
+    } catch (e) {}
+
+    return probe;
+};
+"""
+
+# Runs the installed probe; null means it still has to be injected
+_CALL_PROBE_JS = (
+    "return window.__sentinelProbe"
+    " ? window.__sentinelProbe(arguments[0], arguments[1]) : null;"
+)
+
+
 @dataclass
 class VisualState:
     """Represents the current visual state of the page."""
@@ -108,6 +239,13 @@ class VisualAnalyzer:
             driver: Selenium WebDriver instance
         """
         self.driver = driver
+        self._probe_installer = (
+            _PROBE_INSTALLER_JS
+            .replace("__OVERLAY_SELECTORS__", json.dumps(self.OVERLAY_SELECTORS))
+            .replace("__SPINNER_SELECTORS__", json.dumps(self.SPINNER_SELECTORS))
+            .replace("__ERROR_SELECTORS__", json.dumps(self.ERROR_SELECTORS))
+        )
+        register_page_script(driver, self._probe_installer)
         self._guard = self._init_visual_guard()
         self.visual_agent = self._init_visual_agent()
     
@@ -131,32 +269,34 @@ class VisualAnalyzer:
         Returns:
             Tuple of (is_blocked: bool, reason: str)
         """
+        probe = self._run_combined_probe(check_captcha=True)
+        
         # Check for modal overlays
-        overlay_result = self._has_modal_overlay()
-        if overlay_result[0]:
-            return overlay_result
+        if probe.get("overlay"):
+            return True, probe["overlay"]
         
         # Check for loading spinners
-        spinner_result = self._has_loading_spinner()
-        if spinner_result[0]:
-            return spinner_result
+        if probe.get("spinner"):
+            return True, probe["spinner"]
         
         # Check for captcha challenges
-        captcha_result = self._has_captcha()
-        if captcha_result[0]:
-            return captcha_result
+        if probe.get("captcha"):
+            return True, probe["captcha"]
         
         # Check for page load state
-        if not self._is_page_ready():
+        if not self._is_page_ready(probe):
             return True, "Page still loading"
         
         return False, "Ready"
     
     def get_visual_state(self) -> VisualState:
         """Get detailed visual state information."""
-        overlay_blocked, overlay_reason = self._has_modal_overlay()
-        spinner_blocked, spinner_reason = self._has_loading_spinner()
-        error_detected = self._has_error_message()
+        probe = self._run_combined_probe(check_captcha=False, check_errors=True)
+        overlay_reason = probe.get("overlay") or ""
+        spinner_reason = probe.get("spinner") or ""
+        overlay_blocked = bool(overlay_reason)
+        spinner_blocked = bool(spinner_reason)
+        error_detected = bool(probe.get("error"))
         
         is_blocked = overlay_blocked or spinner_blocked
         reason = overlay_reason if overlay_blocked else (spinner_reason if spinner_blocked else "Ready")
@@ -164,161 +304,44 @@ class VisualAnalyzer:
         return VisualState(
             is_blocked=is_blocked,
             reason=reason,
-            page_ready=self._is_page_ready(),
+            page_ready=self._is_page_ready(probe),
             has_overlay=overlay_blocked,
             has_spinner=spinner_blocked,
             has_error=error_detected,
         )
     
-    def _has_modal_overlay(self) -> Tuple[bool, str]:
-        """Check for visible modal overlays using a single fast JavaScript query."""
-        try:
-            # Combined check in single JavaScript execution for speed
-            script = """
-            const selectors = ['.modal', '.overlay', '.popup', '[role="dialog"]', 
-                              '[role="alertdialog"]', '.lightbox', '.modal-backdrop',
-                              '.modal-overlay', '[data-modal]', '.ReactModal__Overlay',
-                              '.MuiDialog-root', '.ant-modal-mask'];
-            
-            for (const selector of selectors) {
-                const elements = document.querySelectorAll(selector);
-                for (const el of elements) {
-                    if (el.offsetParent !== null) {
-                        const rect = el.getBoundingClientRect();
-                        if (rect.width > 100 && rect.height > 100) {
-                            return {blocked: true, reason: 'Modal overlay: ' + selector};
-                        }
-                    }
-                }
-            }
-            
-            // Quick check for full-screen fixed overlays
-            const fixed = document.querySelectorAll('[style*="position: fixed"], [style*="position:fixed"]');
-            for (const el of fixed) {
-                const rect = el.getBoundingClientRect();
-                if (rect.width > window.innerWidth * 0.8 && rect.height > window.innerHeight * 0.8) {
-                    const style = window.getComputedStyle(el);
-                    if (style.display !== 'none' && style.visibility !== 'hidden') {
-                        return {blocked: true, reason: 'Full-screen overlay'};
-                    }
-                }
-            }
-            
-            return {blocked: false, reason: ''};
-            """
-            result = self.driver.execute_script(script)
-            if result and result.get('blocked'):
-                return True, result.get('reason', 'Modal overlay detected')
-        except Exception:
-            pass
-        
-        return False, ""
-    
-    def _has_loading_spinner(self) -> Tuple[bool, str]:
-        """Check for visible loading indicators using a single fast JavaScript query."""
-        try:
-            script = """
-            const selectors = ['.spinner', '.loading', '.loader', '[role="progressbar"]',
-                              '.progress', '.sk-spinner', '.lds-ring', '.loading-indicator',
-                              '[data-loading]', '.MuiCircularProgress-root', '.ant-spin'];
-            
-            for (const selector of selectors) {
-                const elements = document.querySelectorAll(selector);
-                for (const el of elements) {
-                    if (el.offsetParent !== null) {
-                        return {blocked: true, reason: 'Spinner: ' + selector};
-                    }
-                }
-            }
-            
-            return {blocked: false, reason: ''};
-            """
-            result = self.driver.execute_script(script)
-            if result and result.get('blocked'):
-                return True, result.get('reason', 'Loading spinner detected')
-        except Exception:
-            pass
+    def _run_combined_probe(
+        self, check_captcha: bool = True, check_errors: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run the overlay, spinner, captcha, error and page-ready checks in one round-trip.
         
-        return False, ""
-    
-    def _has_captcha(self) -> Tuple[bool, str]:
-        """Check for captcha challenges with high performance and accuracy."""
+        Returns:
+            Dict with ``overlay``/``spinner``/``captcha`` (reason string or None),
+            ``error`` (first visible error selector or None),
+            ``readyState`` and ``jqueryActive``. Empty if the script failed,
+            which callers treat as "not blocked, ready".
+        """
         try:
-            script = """
-            const highPatterns = ['recaptcha', 'hcaptcha', 'g-recaptcha', 'cf-turnstile', 'arkose'];
-            
-            // 1. Check for Captcha scripts
-            const scripts = Array.from(document.querySelectorAll('script'));
-            for (const s of scripts) {
-                const src = s.src || "";
-                if (highPatterns.some(p => src.includes(p))) {
-                    return {blocked: true, reason: 'Captcha script: ' + src.substring(0, 50)};
-                }
-            }
-
-            // 2. Check for interactive Captcha elements (iframes)
-            const iframes = Array.from(document.querySelectorAll('iframe'));
-            for (const f of iframes) {
-                const src = f.src.toLowerCase();
-                const title = f.title.toLowerCase();
-                if (highPatterns.some(p => src.includes(p) || title.includes(p))) {
-                    return {blocked: true, reason: 'Captcha iframe'};
-                }
-            }
-            
-            // 3. Check for specific Captcha text (medium confidence)
-            const text = document.body.innerText.toLowerCase();
-            const mediumPatterns = ["verify you're human", "not a robot", "security check required"];
-            for (const p of mediumPatterns) {
-                if (text.includes(p) && text.length < 5000) { // Limit text-heavy false positives
-                    return {blocked: true, reason: 'Captcha text'};
-                }
-            }
-            
-            return {blocked: false};
-            """
-            result = self.driver.execute_script(script)
-            if result and result.get('blocked'):
-                return True, result.get('reason')
+            result = call_page_function(
+                self.driver, _CALL_PROBE_JS, self._probe_installer,
+                check_captcha, check_errors,
+            )
         except Exception:
-            pass
-        
-        return False, ""
+            return {}
+        return result if isinstance(result, dict) else {}
     
     def _has_error_message(self) -> bool:
         """Check for visible error messages."""
-        for selector in self.ERROR_SELECTORS:
-            try:
-                elements = self.driver.find_elements("css selector", selector)
-                for elem in elements:
-                    if elem.is_displayed():
-                        return True
-            except Exception:
-                continue
-        
-        return False
+        return bool(self._run_combined_probe(check_captcha=False, check_errors=True).get("error"))
     
-    def _is_page_ready(self) -> bool:
-        """Check if the page has finished loading."""
-        try:
-            # Check document ready state
-            ready_state = self.driver.execute_script("return document.readyState")
-            if ready_state != "complete":
-                return False
-            
-            # Check for pending AJAX requests (jQuery)
-            try:
-                jquery_active = self.driver.execute_script(
-                    "return typeof jQuery !== 'undefined' ? jQuery.active : 0"
-                )
-                if jquery_active > 0:
-                    return False
-            except Exception:
-                pass
-            
-            return True
-        except Exception:
-            return True  # Assume ready if we can't check
+    @staticmethod
+    def _is_page_ready(probe: Dict[str, Any]) -> bool:
+        """Check if the page has finished loading (document + pending jQuery AJAX)."""
+        ready_state = probe.get("readyState")
+        if ready_state is not None and ready_state != "complete":
+            return False
+        return not (probe.get("jqueryActive") or 0) > 0
     
     def capture_state_snapshot(self, name: str) -> Optional[str]:
         """
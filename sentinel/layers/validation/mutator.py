@@ -5,15 +5,103 @@ Uses vandal concepts to intentionally mutate the UI
 and verify test resilience.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
 import random
 
+from sentinel.core.compat import DATACLASS_SLOTS
+from sentinel.core.page_scripts import call_page_function, register_page_script
+
 if TYPE_CHECKING:
     from selenium.webdriver.remote.webdriver import WebDriver
 
 
-@dataclass
+# Page-side element registry so repeated mutations on the same selector
+# skip the document query while the element stays attached
+_ELEMENT_REGISTRY_JS = r"""
+window.__sentinelGet = window.__sentinelGet || (function() {
+    const cache = new Map();
+    return function(selector) {
+        let el = cache.get(selector);
+        if (!el || !el.isConnected) {
+            el = document.querySelector(selector);
+            cache.set(selector, el);
+        }
+        return el;
+    };
+})();
+"""
+
+# Applies one fallback mutation strategy and returns [state needed to
+# revert it], or null if the registry is not installed.
+# arguments: selector, strategy
+_APPLY_MUTATION_JS = r"""
+if (!window.__sentinelGet) return null;
+const el = window.__sentinelGet(arguments[0]);
+let original = null;
+switch (arguments[1]) {
+    case 'stealth_disable':
+        // Disable element without visual change
+        original = el.disabled;
+        el.disabled = true;
+        el.style.pointerEvents = 'none';
+        break;
+    case 'ghost_element':
+        // Hide element but keep space
+        original = el.style.visibility;
+        el.style.visibility = 'hidden';
+        break;
+    case 'data_sabotage':
+        // Change text content slightly
+        original = el.textContent;
+        el.textContent = original + ' ';  // Add invisible change
+        break;
+    case 'logic_sabotage':
+        // Remove click handler
+        el.onclick = (e) => e.preventDefault();
+        original = 'onclick_removed';
+        break;
+    case 'ui_shift':
+        // Shift element position
+        original = el.style.marginLeft;
+        el.style.marginLeft = '50px';
+        break;
+    case 'slow_load':
+        // Add artificial delay (mark element)
+        el.dataset.sentinelDelayed = 'true';
+        original = 'delayed';
+        break;
+}
+return [original];
+"""
+
+# Reverts a fallback mutation; returns null if the registry is not installed.
+# arguments: selector, strategy, original state
+_REVERT_MUTATION_JS = r"""
+if (!window.__sentinelGet) return null;
+const el = window.__sentinelGet(arguments[0]);
+const original = arguments[2];
+switch (arguments[1]) {
+    case 'stealth_disable':
+        el.disabled = String(original).toLowerCase() === 'true';
+        el.style.pointerEvents = '';
+        break;
+    case 'ghost_element':
+        el.style.visibility = original || 'visible';
+        break;
+    case 'data_sabotage':
+        if (original) el.textContent = original;
+        break;
+    case 'ui_shift':
+        el.style.marginLeft = original || '0';
+        break;
+}
+return true;
+"""
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Mutation:
     """Represents a UI mutation."""
     name: str
@@ -25,7 +113,7 @@ class Mutation:
     reverted: bool = False
 
 
-@dataclass 
+@dataclass(**DATACLASS_SLOTS)
 class MutationResult:
     """Result of applying a mutation."""
     mutation: Mutation
@@ -57,14 +145,14 @@ class UIMutator:
         >>> mutator.revert_mutation(mutation)
     """
     
-    MUTATION_STRATEGIES = [
+    MUTATION_STRATEGIES = (
         "stealth_disable",
         "ghost_element", 
         "data_sabotage",
         "logic_sabotage",
         "ui_shift",
         "slow_load",
-    ]
+    )
     
     def __init__(self, driver: "WebDriver"):
         """
@@ -76,6 +164,12 @@ class UIMutator:
         self.driver = driver
         self._vandal = self._init_vandal()
         self._applied_mutations: List[Mutation] = []
+        register_page_script(driver, _ELEMENT_REGISTRY_JS)
+        # Per-instance generator: parallel workers each own a mutator
+        self._rng = random.Random()
+        # Interactive selectors of the last scanned page, keyed by its URL
+        self._selector_cache: Optional[List[str]] = None
+        self._selector_cache_url: Optional[str] = None
     
     def _init_vandal(self):
         """Try to initialize vandal if available."""
@@ -117,10 +211,10 @@ class UIMutator:
         Returns:
             Mutation object with details
         """
-        strategy = random.choice(self.MUTATION_STRATEGIES)
+        strategy = self._rng.choice(self.MUTATION_STRATEGIES)
         
         if target_selectors:
-            selector = random.choice(target_selectors)
+            selector = self._rng.choice(target_selectors)
         else:
             # Find interactive elements
             selector = self._find_random_interactive_element()
@@ -204,59 +298,11 @@ class UIMutator:
         original_state = None
         
         try:
-            if strategy == "stealth_disable":
-                # Disable element without visual change
-                original_state = self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    const original = el.disabled;
-                    el.disabled = true;
-                    el.style.pointerEvents = 'none';
-                    return original;
-                """)
-            
-            elif strategy == "ghost_element":
-                # Hide element but keep space
-                original_state = self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    const original = el.style.visibility;
-                    el.style.visibility = 'hidden';
-                    return original;
-                """)
-            
-            elif strategy == "data_sabotage":
-                # Change text content slightly
-                original_state = self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    const original = el.textContent;
-                    el.textContent = original + ' ';  // Add invisible change
-                    return original;
-                """)
-            
-            elif strategy == "logic_sabotage":
-                # Remove click handler
-                original_state = self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    const original = el.onclick;
-                    el.onclick = (e) => e.preventDefault();
-                    return 'onclick_removed';
-                """)
-            
-            elif strategy == "ui_shift":
-                # Shift element position
-                original_state = self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    const original = el.style.marginLeft;
-                    el.style.marginLeft = '50px';
-                    return original;
-                """)
-            
-            elif strategy == "slow_load":
-                # Add artificial delay (mark element)
-                original_state = self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    el.dataset.sentinelDelayed = 'true';
-                    return 'delayed';
-                """)
+            # One round-trip; selector and strategy travel as arguments
+            result = call_page_function(
+                self.driver, _APPLY_MUTATION_JS, _ELEMENT_REGISTRY_JS, selector, strategy
+            )
+            original_state = result[0] if result else None
             
             mutation = Mutation(
                 name=f"{strategy}_{selector[:20]}",
@@ -283,31 +329,10 @@ class UIMutator:
             strategy = mutation.mutation_type
             original = mutation.original_state
             
-            if strategy == "stealth_disable":
-                self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    el.disabled = {str(original).lower() if original else 'false'};
-                    el.style.pointerEvents = '';
-                """)
-            
-            elif strategy == "ghost_element":
-                self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    el.style.visibility = '{original or "visible"}';
-                """)
-            
-            elif strategy == "data_sabotage":
-                if original:
-                    self.driver.execute_script(f"""
-                        const el = document.querySelector('{selector}');
-                        el.textContent = `{original}`;
-                    """)
-            
-            elif strategy == "ui_shift":
-                self.driver.execute_script(f"""
-                    const el = document.querySelector('{selector}');
-                    el.style.marginLeft = '{original or "0"}';
-                """)
+            call_page_function(
+                self.driver, _REVERT_MUTATION_JS, _ELEMENT_REGISTRY_JS,
+                selector, strategy, original,
+            )
             
             mutation.reverted = True
             return True
@@ -315,46 +340,126 @@ class UIMutator:
         except Exception:
             return False
     
+    def invalidate_selector_cache(self) -> None:
+        """Forget the scanned interactive selectors (call after in-page navigation)."""
+        self._selector_cache = None
+        self._selector_cache_url = None
+    
     def _find_random_interactive_element(self) -> str:
         """Find a random interactive element on the page."""
         try:
-            selectors = self.driver.execute_script("""
-                const elements = document.querySelectorAll('button, a, input, select');
-                const visible = Array.from(elements).filter(el => 
-                    el.offsetParent !== null && 
-                    el.offsetWidth > 0 && 
-                    el.offsetHeight > 0
-                );
-                return visible.slice(0, 10).map(el => {
-                    if (el.id) return '#' + el.id;
-                    if (el.className) return el.tagName.toLowerCase() + '.' + el.className.split(' ')[0];
-                    return el.tagName.toLowerCase();
-                });
-            """)
+            url = self.driver.current_url
+            if self._selector_cache is not None and url == self._selector_cache_url:
+                selectors = self._selector_cache
+            else:
+                selectors = self._scan_interactive_selectors()
+                # An empty scan may just be a page still loading; rescan next time
+                if selectors:
+                    self._selector_cache = selectors
+                    self._selector_cache_url = url
             
             if selectors:
-                return random.choice(selectors)
+                return self._rng.choice(selectors)
             return "button"
         except Exception:
             return "button"
     
+    def _scan_interactive_selectors(self) -> List[str]:
+        """Collect selectors for up to 10 visible interactive elements."""
+        return self.driver.execute_script("""
+            const elements = document.querySelectorAll('button, a, input, select');
+            const visible = Array.from(elements).filter(el => 
+                el.offsetParent !== null && 
+                el.offsetWidth > 0 && 
+                el.offsetHeight > 0
+            );
+            return visible.slice(0, 10).map(el => {
+                if (el.id) return '#' + el.id;
+                if (el.className) return el.tagName.toLowerCase() + '.' + el.className.split(' ')[0];
+                return el.tagName.toLowerCase();
+            });
+        """) or []
+    
     def run_mutation_test(
         self,
         test_function,
         selectors: Optional[List[str]] = None,
         num_mutations: int = 5,
+        driver_factory: Optional[Callable[[], "WebDriver"]] = None,
+        workers: int = 1,
     ) -> List[MutationResult]:
         """
         Run a mutation test suite.
         
+        Mutants are independent, so with a ``driver_factory`` the budget is
+        sharded across ``workers`` browser sessions that run concurrently.
+        Each worker gets its own driver and ``UIMutator``; the driver is
+        passed to ``test_function`` and quit when the worker finishes.
+        
         Args:
-            test_function: Function that runs the test, returns True if passed
+            test_function: Function that runs the test, returns True if passed.
+                Called with no arguments, or with the worker's driver when
+                ``driver_factory`` is given.
             selectors: Optional list of element selectors to mutate
             num_mutations: Number of mutations to apply
+            driver_factory: Optional callable returning a new WebDriver
+                already on the page under test
+            workers: Number of parallel sessions (requires driver_factory)
         
         Returns:
             List of MutationResult objects
         """
+        if num_mutations <= 0:
+            return []
+        if driver_factory is None:
+            return self._run_mutations(test_function, selectors, num_mutations)
+        
+        workers = max(1, min(workers, num_mutations))
+        if workers <= 1:
+            return self._run_worker(driver_factory, test_function, selectors, num_mutations)
+        
+        shares = [
+            num_mutations // workers + (1 if i < num_mutations % workers else 0)
+            for i in range(workers)
+        ]
+        
+        results: List[MutationResult] = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self._run_worker, driver_factory, test_function, selectors, share)
+                for share in shares
+            ]
+            for future in futures:
+                results.extend(future.result())
+        return results
+    
+    def _run_worker(
+        self,
+        driver_factory: Callable[[], "WebDriver"],
+        test_function,
+        selectors: Optional[List[str]],
+        num_mutations: int,
+    ) -> List[MutationResult]:
+        """Run a share of the mutation budget in a fresh browser session."""
+        driver = driver_factory()
+        try:
+            mutator = UIMutator(driver)
+            return mutator._run_mutations(
+                lambda: test_function(driver), selectors, num_mutations
+            )
+        finally:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    
+    def _run_mutations(
+        self,
+        test_function,
+        selectors: Optional[List[str]],
+        num_mutations: int,
+    ) -> List[MutationResult]:
+        """Apply, test and revert mutations serially on this mutator's driver."""
         results = []
         
         for _ in range(num_mutations):
@@ -5,25 +5,94 @@ Captures the agent's decision-making process and generates
 beautiful reports using pytest-glow-report concepts.
 """
 
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, TextIO, Tuple, TYPE_CHECKING
 from datetime import datetime
+import io
 import json
+import logging
 import os
+import time
+
+from sentinel.core.compat import DATACLASS_SLOTS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 if TYPE_CHECKING:
     from sentinel.layers.intelligence.decision_engine import Decision
 
+logger = logging.getLogger(__name__)
+
+
+# Timeline icon per event type
+_EVENT_ICONS = {
+    "navigation": "🧭",
+    "world_state": "👁️",
+    "decision": "🧠",
+    "action": "⚡",
+    "warning": "⚠️",
+    "error": "❌",
+    "info": "ℹ️",
+}
+
+# Lists/dicts whose repr reaches this length are left out of the timeline
+_INLINE_DATA_MAX_CHARS = 200
+
+# One timeline row of the fallback HTML report
+_TIMELINE_TEMPLATE = """
+            <div class="timeline-item {status_class}">
+                <div class="timeline-icon">{icon}</div>
+                <div class="timeline-content">
+                    <div class="timeline-time">{time}</div>
+                    <div class="timeline-message">{message}</div>
+                    {data}
+                    {screenshot}
+                </div>
+            </div>
+            """
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values stdlib json does not handle natively."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
 
-@dataclass
+def _dumps(value: Any, indent: bool = False) -> str:
+    """
+    Serialize to JSON, using orjson when it is installed.
+    
+    orjson encodes datetimes natively and is several times faster than
+    the stdlib encoder on the nested dicts logged per entry.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, default=str, option=option).decode()
+    return json.dumps(value, indent=2 if indent else None, default=_json_default)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class LogEntry:
     """A single log entry in the flight record."""
-    timestamp: datetime
+    timestamp_ns: int  # time.time_ns() at logging time
     step: int
     event_type: str  # 'navigation', 'world_state', 'decision', 'action', 'warning', 'error', 'info'
     message: str
     data: Dict[str, Any] = field(default_factory=dict)
     screenshot_path: Optional[str] = None
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Local wall-clock time of the entry."""
+        seconds, nanos = divmod(self.timestamp_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000)
 
 
 class FlightRecorder:
@@ -60,6 +129,7 @@ class FlightRecorder:
         self.output_dir = output_dir
         self.run_name = run_name or datetime.now().strftime("%Y%m%d_%H%M%S")
         self.entries: List[LogEntry] = []
+        self._counts: Dict[str, int] = defaultdict(int)
         self.metadata: Dict[str, Any] = {
             "start_time": datetime.now().isoformat(),
             "run_name": self.run_name,
@@ -69,6 +139,21 @@ class FlightRecorder:
         self.run_dir = os.path.join(output_dir, self.run_name)
         self.screenshots_dir = os.path.join(self.run_dir, "screenshots")
         os.makedirs(self.screenshots_dir, exist_ok=True)
+        self._screenshots_rel = os.path.relpath(self.screenshots_dir, self.run_dir)
+        self._screenshot_sizes: Dict[str, Optional[Tuple[int, int]]] = {}
+        
+        # Entries are streamed to an NDJSON sidecar as they are logged, so the
+        # record survives a crash and the report never re-serializes the run.
+        # The newest entry is held back until the next one arrives because
+        # capture_screenshot() may still attach a screenshot to it.
+        self.ndjson_path = os.path.join(self.run_dir, "entries.ndjson")
+        self._ndjson = open(self.ndjson_path, "w", encoding="utf-8", buffering=1 << 16)
+        self._pending: Optional[LogEntry] = None
+        # Last entry already in the sidecar and the byte offset of its line,
+        # so a late screenshot can rewrite that line in place
+        self._last_written: Optional[LogEntry] = None
+        self._last_offset = 0
+        self._sidecar_size = 0
         
         self._glow = self._init_glow_report()
     
@@ -80,10 +165,72 @@ class FlightRecorder:
         except ImportError:
             return None
     
+    @staticmethod
+    def _entry_to_dict(entry: LogEntry) -> Dict[str, Any]:
+        """Convert a log entry to its JSON form."""
+        return {
+            "timestamp": entry.timestamp,
+            "step": entry.step,
+            "event_type": entry.event_type,
+            "message": entry.message,
+            "data": entry.data,
+            "screenshot_path": entry.screenshot_path,
+        }
+    
+    def _record(self, entry: LogEntry) -> None:
+        """Append an entry and stream the previous one to the sidecar."""
+        self._write_pending()
+        self.entries.append(entry)
+        self._pending = entry
+        if self._ndjson.closed:
+            # No open handle to hold the entry back on; write it straight away
+            self._write_pending()
+    
+    def _write_pending(self) -> None:
+        """Write the held-back entry to the NDJSON sidecar."""
+        if self._pending is None:
+            return
+        line = _dumps(self._entry_to_dict(self._pending)) + "\n"
+        if self._ndjson.closed:
+            logger.warning("[FlightRecorder] Entry logged after close(); appending it to the sidecar")
+            with open(self.ndjson_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        else:
+            self._ndjson.write(line)
+        self._last_written = self._pending
+        self._last_offset = self._sidecar_size
+        self._sidecar_size += len(line.encode("utf-8"))
+        self._pending = None
+    
+    def _rewrite_last_written(self) -> None:
+        """Replace the sidecar's last line after its entry changed."""
+        line = _dumps(self._entry_to_dict(self._last_written)).encode("utf-8") + b"\n"
+        if not self._ndjson.closed:
+            self._ndjson.flush()
+        with open(self.ndjson_path, "r+b") as f:
+            f.seek(self._last_offset)
+            f.truncate()
+            f.write(line)
+        if not self._ndjson.closed:
+            # The shared handle still points past the old line
+            self._ndjson.seek(0, os.SEEK_END)
+        self._sidecar_size = self._last_offset + len(line)
+    
+    def flush(self) -> None:
+        """Write all logged entries to the NDJSON sidecar."""
+        self._write_pending()
+        if not self._ndjson.closed:
+            self._ndjson.flush()
+    
+    def close(self) -> None:
+        """Flush and close the NDJSON sidecar."""
+        self.flush()
+        self._ndjson.close()
+    
     def log_navigation(self, url: str) -> None:
         """Log a navigation event."""
-        self.entries.append(LogEntry(
-            timestamp=datetime.now(),
+        self._record(LogEntry(
+            timestamp_ns=time.time_ns(),
             step=0,
             event_type="navigation",
             message=f"Navigated to {url}",
@@ -105,8 +252,8 @@ class FlightRecorder:
             for elem in world_state[:10]  # Limit to first 10
         ]
         
-        self.entries.append(LogEntry(
-            timestamp=datetime.now(),
+        self._record(LogEntry(
+            timestamp_ns=time.time_ns(),
             step=step,
             event_type="world_state",
             message=f"World state: {len(world_state)} elements, blocked={is_blocked}",
@@ -130,13 +277,14 @@ class FlightRecorder:
             short_reason = decision.reasoning.split('.')[0]
             message += f" because {short_reason.lower()}"
 
-        self.entries.append(LogEntry(
-            timestamp=datetime.now(),
+        self._record(LogEntry(
+            timestamp_ns=time.time_ns(),
             step=step,
             event_type="decision",
             message=message,
             data=decision.to_dict(),
         ))
+        self._counts["decision"] += 1
         
         if self._glow:
             try:
@@ -162,18 +310,19 @@ class FlightRecorder:
         msg = f"{status_emoji} {action.capitalize()} on '{target[:30]}' "
         msg += "succeeded" if success else f"failed: {error or 'Unknown error'}"
 
-        self.entries.append(LogEntry(
-            timestamp=datetime.now(),
+        self._record(LogEntry(
+            timestamp_ns=time.time_ns(),
             step=step,
             event_type="action",
             message=msg,
             data={"success": success, "error": error, "meta": meta},
         ))
+        self._counts["action_success" if success else "action_failed"] += 1
     
     def log_info(self, message: str) -> None:
         """Log a general information message."""
-        self.entries.append(LogEntry(
-            timestamp=datetime.now(),
+        self._record(LogEntry(
+            timestamp_ns=time.time_ns(),
             step=len(self.entries),
             event_type="info",
             message=message,
@@ -181,8 +330,8 @@ class FlightRecorder:
     
     def log_warning(self, message: str) -> None:
         """Log a warning."""
-        self.entries.append(LogEntry(
-            timestamp=datetime.now(),
+        self._record(LogEntry(
+            timestamp_ns=time.time_ns(),
             step=len(self.entries),
             event_type="warning",
             message=message,
@@ -190,8 +339,8 @@ class FlightRecorder:
     
     def log_error(self, message: str, exception: Optional[Exception] = None) -> None:
         """Log an error."""
-        self.entries.append(LogEntry(
-            timestamp=datetime.now(),
+        self._record(LogEntry(
+            timestamp_ns=time.time_ns(),
             step=len(self.entries),
             event_type="error",
             message=message,
@@ -220,9 +369,13 @@ class FlightRecorder:
                 path = os.path.join(self.screenshots_dir, f"{name}.png")
                 driver.save_screenshot(path)
                 
-                # Add to last entry
+                # Add to last entry; if it already reached the sidecar
+                # (flush, report or close), rewrite its line there too
                 if self.entries:
-                    self.entries[-1].screenshot_path = path
+                    last = self.entries[-1]
+                    last.screenshot_path = path
+                    if last is self._last_written:
+                        self._rewrite_last_written()
                 
                 return path
             except Exception:
@@ -238,7 +391,7 @@ class FlightRecorder:
             Path to the generated report
         """
         self.metadata["end_time"] = datetime.now().isoformat()
-        self.metadata["total_steps"] = len([e for e in self.entries if e.event_type == "decision"])
+        self.metadata["total_steps"] = self._counts["decision"]
         
         # If glow is available, use it
         if self._glow:
@@ -254,69 +407,40 @@ class FlightRecorder:
         """Generate a simple HTML report without glow."""
         report_path = os.path.join(self.run_dir, "report.html")
         
-        # Build HTML
-        html = self._build_html_report()
+        # Stream HTML row by row instead of building it in memory
+        with open(report_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+            self._write_html_report(f)
         
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write(html)
-        
-        # Also save JSON log
+        # Also save JSON log, consolidated from the streamed sidecar
+        self.flush()
         json_path = os.path.join(self.run_dir, "flight_record.json")
-        with open(json_path, "w") as f:
-            json.dump({
-                "metadata": self.metadata,
-                "entries": [
-                    {
-                        "timestamp": e.timestamp.isoformat(),
-                        "step": e.step,
-                        "event_type": e.event_type,
-                        "message": e.message,
-                        "data": e.data,
-                        "screenshot_path": e.screenshot_path,
-                    }
-                    for e in self.entries
-                ],
-            }, f, indent=2)
+        with open(json_path, "w", encoding="utf-8") as out, \
+                open(self.ndjson_path, encoding="utf-8") as entries:
+            out.write('{"metadata": ')
+            out.write(_dumps(self.metadata, indent=True))
+            out.write(',\n"entries": [\n')
+            for i, line in enumerate(entries):
+                if i:
+                    out.write(",\n")
+                out.write(line.rstrip("\n"))
+            out.write("\n]}\n")
         
         return report_path
     
     def _build_html_report(self) -> str:
         """Build HTML report content."""
-        # Count results
-        decisions = [e for e in self.entries if e.event_type == "decision"]
-        actions = [e for e in self.entries if e.event_type == "action"]
-        success_count = len([a for a in actions if a.data.get("success")])
-        failed_count = len(actions) - success_count
-        
-        # Build timeline
-        timeline_html = ""
-        for entry in self.entries:
-            icon = self._get_event_icon(entry.event_type)
-            status_class = self._get_status_class(entry)
-            
-            # Calculate relative path for screenshot
-            screenshot_html = ""
-            if entry.screenshot_path:
-                try:
-                    rel_path = os.path.relpath(entry.screenshot_path, self.run_dir)
-                    screenshot_html = f'<img src="{rel_path}" class="timeline-screenshot">'
-                except ValueError:
-                    # Fallback if paths are on different drives
-                    screenshot_html = f'<img src="{entry.screenshot_path}" class="timeline-screenshot">'
-
-            timeline_html += f"""
-            <div class="timeline-item {status_class}">
-                <div class="timeline-icon">{icon}</div>
-                <div class="timeline-content">
-                    <div class="timeline-time">{entry.timestamp.strftime('%H:%M:%S')}</div>
-                    <div class="timeline-message">{entry.message}</div>
-                    {self._format_data(entry.data) if entry.data else ''}
-                    {screenshot_html}
-                </div>
-            </div>
-            """
-        
-        html = f"""<!DOCTYPE html>
+        buffer = io.StringIO()
+        self._write_html_report(buffer)
+        return buffer.getvalue()
+    
+    def _write_html_report(self, f: TextIO) -> None:
+        """Write HTML report content to a text stream."""
+        # Counters are maintained at log time
+        decision_count = self._counts["decision"]
+        success_count = self._counts["action_success"]
+        failed_count = self._counts["action_failed"]
+        
+        f.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -438,6 +562,7 @@ class FlightRecorder:
         
         .timeline-screenshot {{
             max-width: 300px;
+            height: auto;
             margin-top: 0.5rem;
             border-radius: 4px;
         }}
@@ -457,7 +582,7 @@ class FlightRecorder:
         
         <div class="stats">
             <div class="stat-card">
-                <div class="stat-value">{len(decisions)}</div>
+                <div class="stat-value">{decision_count}</div>
                 <div class="stat-label">Decisions</div>
             </div>
             <div class="stat-card">
@@ -472,26 +597,61 @@ class FlightRecorder:
         
         <div class="timeline">
             <h2 style="margin-bottom: 1rem;">Timeline</h2>
-            {timeline_html}
-        </div>
+""")
+        
+        # Timeline rows are written one at a time
+        for entry in self.entries:
+            # Calculate relative path for screenshot
+            screenshot_html = ""
+            if entry.screenshot_path:
+                head, name = os.path.split(entry.screenshot_path)
+                if head == self.screenshots_dir:
+                    # Our own screenshots: plain string join, no path resolution
+                    rel_path = f"{self._screenshots_rel}/{name}"
+                else:
+                    try:
+                        rel_path = os.path.relpath(entry.screenshot_path, self.run_dir)
+                    except ValueError:
+                        # Fallback if paths are on different drives
+                        rel_path = entry.screenshot_path
+                screenshot_html = self._screenshot_tag(entry.screenshot_path, rel_path)
+
+            f.write(_TIMELINE_TEMPLATE.format(
+                status_class=self._get_status_class(entry),
+                icon=self._get_event_icon(entry.event_type),
+                time=time.strftime('%H:%M:%S', time.localtime(entry.timestamp_ns // 1_000_000_000)),
+                message=entry.message,
+                data=self._format_data(entry.data) if entry.data else '',
+                screenshot=screenshot_html,
+            ))
+        
+        f.write("""        </div>
     </div>
 </body>
-</html>"""
+</html>""")
+    
+    def _screenshot_tag(self, path: str, src: str) -> str:
+        """
+        Build a lazily loaded <img> tag for a timeline screenshot.
         
-        return html
+        Width/height are included when Pillow can read the image header so
+        the browser reserves space without decoding offscreen images.
+        """
+        if path not in self._screenshot_sizes:
+            try:
+                from PIL import Image
+                with Image.open(path) as img:
+                    self._screenshot_sizes[path] = img.size
+            except Exception:
+                self._screenshot_sizes[path] = None
+        
+        size = self._screenshot_sizes[path]
+        dims = f' width="{size[0]}" height="{size[1]}"' if size else ""
+        return f'<img src="{src}" class="timeline-screenshot" loading="lazy" decoding="async"{dims}>'
     
     def _get_event_icon(self, event_type: str) -> str:
         """Get emoji icon for event type."""
-        icons = {
-            "navigation": "🧭",
-            "world_state": "👁️",
-            "decision": "🧠",
-            "action": "⚡",
-            "warning": "⚠️",
-            "error": "❌",
-            "info": "ℹ️",
-        }
-        return icons.get(event_type, "📝")
+        return _EVENT_ICONS.get(event_type, "📝")
     
     def _get_status_class(self, entry: LogEntry) -> str:
         """Get CSS class based on entry status."""
@@ -503,13 +663,24 @@ class FlightRecorder:
             return "success" if entry.data.get("success") else "error"
         return ""
     
+    @staticmethod
+    def _fits_inline(value: Any) -> bool:
+        """Check whether a data value is small enough to show in the timeline."""
+        if not isinstance(value, (list, dict)):
+            return True
+        # A container of n items renders to at least 3n characters, so
+        # large ones are rejected without stringifying them
+        if 3 * len(value) >= _INLINE_DATA_MAX_CHARS:
+            return False
+        return len(str(value)) < _INLINE_DATA_MAX_CHARS
+    
     def _format_data(self, data: Dict[str, Any]) -> str:
         """Format data as HTML."""
         if not data:
             return ""
         
         # Filter out large data
-        filtered = {k: v for k, v in data.items() if not isinstance(v, (list, dict)) or len(str(v)) < 200}
+        filtered = {k: v for k, v in data.items() if self._fits_inline(v)}
         
         if not filtered:
             return ""
@@ -7,25 +7,184 @@ Loads flight records from past Sentinel runs and allows:
 - Comparison of current vs recorded results
 """
 
+import hashlib
 import json
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 from datetime import datetime
 import logging
 
+from sentinel.core.compat import DATACLASS_SLOTS
+from sentinel.core.disk_cache import cache_dir, prune_cache_dir
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+try:
+    from ciso8601 import parse_datetime as _parse_timestamp
+except ImportError:
+    def _parse_timestamp(value: str) -> datetime:
+        """Parse an ISO 8601 timestamp, accepting a trailing 'Z'."""
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+
 logger = logging.getLogger(__name__)
 
+# An ISO 8601 timestamp ends in a digit or a 'Z' designator
+_ISO_LAST_CHARS = frozenset("Z0123456789")
+
+# Decisions that can be replayed inside a single browser script
+_BATCHABLE_ACTIONS = frozenset({"click", "type"})
+
+# Performs a list of {action, target, value} in order and returns how many
+# completed; stops at the first target that cannot be found or cannot be
+# typed into natively (e.g. contenteditable), leaving it to the executor.
+# Typing mirrors the executor's clear() + send_keys(): the field is cleared,
+# then each character gets keydown/input/keyup. A click always ends the
+# script, since it may submit a form or navigate away from this document.
+_REPLAY_BATCH_JS = r"""
+const actions = arguments[0];
+// Native setters so framework-controlled inputs (React, Vue) see the change
+const setters = {
+    INPUT: Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set,
+    TEXTAREA: Object.getOwnPropertyDescriptor(HTMLTextAreaElement.prototype, 'value').set,
+};
+const key = (el, type, ch) =>
+    el.dispatchEvent(new KeyboardEvent(type, {key: ch, bubbles: true, cancelable: true}));
+let done = 0;
+for (const a of actions) {
+    let el;
+    try { el = document.querySelector(a.target); } catch (e) { break; }
+    if (!el) break;
+    if (a.action === 'click') {
+        el.click();
+        done++;
+        break;
+    }
+    const setValue = setters[el.tagName];
+    if (!setValue || el.readOnly || el.disabled) break;
+    el.focus();
+    setValue.call(el, '');
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    let text = '';
+    for (const ch of a.value) {
+        key(el, 'keydown', ch);
+        text += ch;
+        setValue.call(el, text);
+        el.dispatchEvent(new InputEvent('input', {bubbles: true, data: ch, inputType: 'insertText'}));
+        key(el, 'keyup', ch);
+    }
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    done++;
+}
+return done;
+"""
+
+# Bump when the cached session layout changes so stale entries are ignored
+_CACHE_VERSION = 6
+
+
+# Confidence bars for 0.0, 0.1, ... 1.0
+_CONF_BARS = tuple("█" * i + "░" * (10 - i) for i in range(11))
+
+
+def confidence_bar(confidence: float) -> str:
+    """Render a confidence score as a 10-cell bar."""
+    return _CONF_BARS[max(0, min(10, int(confidence * 10)))]
+
+
+def confidence_histogram(confidences: Sequence[float], nbins: int = 10) -> List[int]:
+    """
+    Count confidence scores in equal-width bins over [0, 1].
+    
+    Scores outside the range fall into the first/last bin.
+    """
+    if nbins <= 0:
+        raise ValueError("nbins must be positive")
+    counts = [0] * nbins
+    last = nbins - 1
+    for confidence in confidences:
+        counts[max(0, min(last, int(confidence * nbins)))] += 1
+    return counts
+
 
-@dataclass
+def rolling_mean(values: Sequence[float], window: int) -> List[float]:
+    """
+    Trailing mean over ``window`` values, one result per full window.
+    
+    Uses a running sum, so the cost is O(n) regardless of window size.
+    """
+    if window <= 0:
+        raise ValueError("window must be positive")
+    means = []
+    total = 0.0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        if i >= window - 1:
+            means.append(total / window)
+    return means
+
+
+def _epoch_seconds(value: Any) -> Optional[float]:
+    """Epoch seconds of an ISO 8601 timestamp, or None if it is not one."""
+    # Only strings that can be ISO 8601 reach the parser, so missing or
+    # junk values skip the exception path
+    if not isinstance(value, str) or not value or value[-1] not in _ISO_LAST_CHARS:
+        return None
+    try:
+        return _parse_timestamp(value).timestamp()
+    except (ValueError, TypeError):
+        return None
+
+
+def _write_cache_file(cache_path: str, payload: bytes) -> None:
+    """Atomically write a cache entry and keep the cache bounded (best effort)."""
+    try:
+        # Write then rename so a concurrent load never reads a partial file
+        partial = f"{cache_path}.{os.getpid()}.tmp"
+        with open(partial, "wb") as f:
+            f.write(payload)
+        os.replace(partial, cache_path)
+    except OSError as e:
+        logger.debug(f"[SessionReplayer] Could not write cache entry ({e})")
+        return
+    prune_cache_dir(os.path.dirname(cache_path))
+
+
+@dataclass(**DATACLASS_SLOTS)
 class ReplayStep:
     """A single step in a replay session."""
     step_number: int
-    timestamp: datetime
+    timestamp_s: float  # Unix epoch seconds
     event_type: str
     message: str
     data: Dict[str, Any] = field(default_factory=dict)
     screenshot_path: Optional[str] = None
+    screenshot_missing: bool = False  # set by load(validate_screenshots=True)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Local wall-clock time of the step."""
+        return datetime.fromtimestamp(self.timestamp_s)
     
     @property
     def action(self) -> Optional[str]:
@@ -48,23 +207,40 @@ class ReplayStep:
         return self.data.get("reasoning")
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ReplaySession:
     """A complete replay session from a flight record."""
     run_id: str
     url: str
     goal: str
-    start_time: datetime
-    end_time: Optional[datetime]
+    start_s: float  # Unix epoch seconds
+    end_s: Optional[float]
     steps: List[ReplayStep] = field(default_factory=list)
     success: bool = False
     total_decisions: int = 0
+    decision_indices: List[int] = field(default_factory=list)  # positions in steps
+    
+    @property
+    def start_time(self) -> datetime:
+        """Local time of the first step."""
+        return datetime.fromtimestamp(self.start_s)
+    
+    @property
+    def end_time(self) -> Optional[datetime]:
+        """Local time of the last step."""
+        return datetime.fromtimestamp(self.end_s) if self.end_s is not None else None
+    
+    @property
+    def confidences(self) -> List[float]:
+        """Confidence of each decision step, in order."""
+        steps = self.steps
+        return [steps[i].confidence for i in self.decision_indices]
     
     @property
     def duration_seconds(self) -> float:
         """Total session duration in seconds."""
-        if self.end_time:
-            return (self.end_time - self.start_time).total_seconds()
+        if self.end_s is not None:
+            return self.end_s - self.start_s
         return 0.0
 
 
@@ -80,159 +256,387 @@ class SessionReplayer:
         >>> replayer.replay_on_browser(driver)  # Re-execute on live browser
     """
     
-    def __init__(self, report_dir: str):
+    def __init__(self, report_dir: str, use_cache: bool = True):
         """
         Initialize the session replayer.
         
         Args:
             report_dir: Path to the report directory containing flight_record.json
+                and/or the recorder's entries.ndjson
+            use_cache: Reuse a previously parsed session for an unchanged record
         """
         self.report_dir = report_dir
         self.flight_record_path = os.path.join(report_dir, "flight_record.json")
+        self.entries_path = os.path.join(report_dir, "entries.ndjson")
+        self.use_cache = use_cache
         self.session: Optional[ReplaySession] = None
-        self._current_step_index = 0
+        self._step_iter: Optional[Iterator[ReplayStep]] = None
+        self._decisions_cache: Optional[List[ReplayStep]] = None
         
-    def load(self) -> ReplaySession:
+    def load(self, validate_screenshots: bool = False) -> ReplaySession:
         """
         Load the flight record and parse into a ReplaySession.
         
+        The recorder's line-delimited entries.ndjson is preferred when
+        present: it is parsed one line at a time, and also exists for runs
+        that never reached report generation. Otherwise flight_record.json
+        is used.
+        
+        Parsed sessions are cached as JSON in the per-user cache directory
+        (see sentinel.core.disk_cache), keyed on the record's path, mtime
+        and size, so replaying the same run again skips parsing the record.
+        
+        Args:
+            validate_screenshots: Check every step's screenshot exists and
+                flag missing ones via ``ReplayStep.screenshot_missing``
+        
         Returns:
             ReplaySession with all recorded steps.
         """
-        if not os.path.exists(self.flight_record_path):
+        source = self._record_source()
+        if source is None:
             raise FileNotFoundError(f"Flight record not found: {self.flight_record_path}")
         
-        with open(self.flight_record_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        cache_path = self._session_cache_path(source) if self.use_cache else None
+        session = self._load_cached_session(cache_path) if cache_path else None
         
-        # Parse the flight record
-        self.session = self._parse_flight_record(data)
+        if session is None:
+            if source == self.entries_path:
+                session = self._parse_entries_file()
+            else:
+                session = self._parse_record_file()
+            if cache_path:
+                self._store_cached_session(cache_path, session)
+        
+        if validate_screenshots:
+            self._validate_screenshots(session.steps)
+        
+        self.session = session
+        self._decisions_cache = None
+        self._step_iter = iter(session.steps)
         logger.info(f"[SessionReplayer] Loaded session with {len(self.session.steps)} steps")
         
         return self.session
     
+    @staticmethod
+    def _validate_screenshots(steps: List[ReplayStep]) -> None:
+        """Flag steps whose screenshot file no longer exists."""
+        shots = [step for step in steps if step.screenshot_path]
+        if not shots:
+            return
+        # Existence checks are pure I/O waits, so overlap them
+        with ThreadPoolExecutor(max_workers=min(16, len(shots))) as pool:
+            found = pool.map(os.path.exists, [step.screenshot_path for step in shots])
+            for step, exists in zip(shots, found):
+                step.screenshot_missing = not exists
+    
+    def _record_source(self) -> Optional[str]:
+        """Path of the record to load, or None if the run has none."""
+        for path in (self.entries_path, self.flight_record_path):
+            if os.path.exists(path):
+                return path
+        return None
+    
+    def _parse_entries_file(self) -> ReplaySession:
+        """
+        Parse the line-delimited entries sidecar, one entry per line.
+        
+        The sidecar carries no run metadata, so the header of
+        flight_record.json is used when the report was generated.
+        """
+        metadata = self._read_record_metadata() if os.path.exists(self.flight_record_path) else {}
+        with open(self.entries_path, "rb") as f:
+            return self._build_session(metadata, self._iter_entries(f))
+    
+    def _iter_entries(self, f) -> Iterator[Dict[str, Any]]:
+        """Decode sidecar lines, stopping at a partial line left by a crash."""
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = _loads(line)
+            except ValueError:
+                # The recorder writes through a buffer, so a crashed run can
+                # end mid-line; a bad line with more data after it is real
+                # corruption
+                if any(rest.strip() for rest in f):
+                    raise
+                logger.warning(f"[SessionReplayer] Ignoring truncated last entry in {self.entries_path}")
+                return
+            yield entry
+    
+    def _read_record_metadata(self) -> Dict[str, Any]:
+        """Read only the metadata header of flight_record.json."""
+        try:
+            with open(self.flight_record_path, "rb") as f:
+                if ijson is not None:
+                    return next(ijson.items(f, "metadata", use_float=True), {})
+                return _loads(f.read()).get("metadata", {})
+        except Exception as e:
+            logger.debug(f"[SessionReplayer] Could not read record metadata ({e})")
+            return {}
+    
+    def _parse_record_file(self) -> ReplaySession:
+        """Parse flight_record.json from disk."""
+        if ijson is not None:
+            # Stream entries one at a time instead of loading the whole record
+            with open(self.flight_record_path, "rb") as f:
+                metadata = next(ijson.items(f, "metadata", use_float=True), {})
+                f.seek(0)
+                entries = ijson.items(f, "entries.item", use_float=True)
+                return self._build_session(metadata, entries)
+        
+        with open(self.flight_record_path, "rb") as f:
+            data = _loads(f.read())
+        
+        # Parse the flight record
+        return self._parse_flight_record(data)
+    
+    def _session_cache_path(self, source: str) -> Optional[str]:
+        """
+        Cache file for the current version of the record at ``source``.
+        
+        The key covers flight_record.json as well when it exists, since a
+        session parsed from the sidecar takes its metadata from that file.
+        """
+        parts = [str(_CACHE_VERSION)]
+        for path in dict.fromkeys((source, self.flight_record_path)):
+            try:
+                st = os.stat(path)
+            except OSError:
+                if path == source:
+                    return None
+                continue
+            parts.append(f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}")
+        directory = cache_dir()
+        if directory is None:
+            return None
+        key = ":".join(parts)
+        return os.path.join(directory, hashlib.sha1(key.encode()).hexdigest() + ".replay.json")
+    
+    def _load_cached_session(self, cache_path: str) -> Optional[ReplaySession]:
+        """Load a cached ReplaySession, or None if missing or unreadable."""
+        try:
+            with open(cache_path, "rb") as f:
+                url, goal, start_s, end_s, success, total, indices, rows = _loads(f.read())
+            steps = [
+                ReplayStep(number, ts, sys.intern(event_type), message, data, shot, False)
+                for number, ts, event_type, message, data, shot in rows
+            ]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"[SessionReplayer] Ignoring replay cache ({e})")
+            return None
+        return ReplaySession(
+            run_id=os.path.basename(self.report_dir),
+            url=url,
+            goal=goal,
+            start_s=start_s,
+            end_s=end_s,
+            steps=steps,
+            success=success,
+            total_decisions=total,
+            decision_indices=indices,
+        )
+    
+    def _store_cached_session(self, cache_path: str, session: ReplaySession) -> None:
+        """Write the parsed session to the cache as plain JSON (best effort)."""
+        try:
+            payload = _dumps([
+                session.url,
+                session.goal,
+                session.start_s,
+                session.end_s,
+                session.success,
+                session.total_decisions,
+                session.decision_indices,
+                [
+                    (step.step_number, step.timestamp_s, step.event_type,
+                     step.message, step.data, step.screenshot_path)
+                    for step in session.steps
+                ],
+            ])
+        except Exception as e:
+            logger.debug(f"[SessionReplayer] Could not serialize replay cache ({e})")
+            return
+        _write_cache_file(cache_path, payload)
+    
     def _parse_flight_record(self, data: Dict[str, Any]) -> ReplaySession:
         """Parse raw flight record JSON into a ReplaySession."""
-        entries = data.get("entries", [])
-        metadata = data.get("metadata", {})
-        
+        return self._build_session(data.get("metadata", {}), data.get("entries", []))
+    
+    def _build_session(
+        self,
+        metadata: Dict[str, Any],
+        entries: Iterable[Dict[str, Any]],
+    ) -> ReplaySession:
+        """Build a ReplaySession from metadata and an iterable of raw entries."""
         steps = []
         url = ""
-        goal = metadata.get("goal", "Unknown goal")
-        start_time = None
-        end_time = None
-        total_decisions = 0
+        goal = metadata.get("goal") or "Unknown goal"
+        decision_indices: List[int] = []
         success = False
         
         for entry in entries:
-            # Parse timestamp
-            ts_str = entry.get("timestamp", "")
-            try:
-                timestamp = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
-            except:
-                timestamp = datetime.now()
-            
-            if start_time is None:
-                start_time = timestamp
-            end_time = timestamp
-            
-            event_type = entry.get("event_type", "unknown")
-            message = entry.get("message", "")
-            entry_data = entry.get("data", {})
-            screenshot = entry.get("screenshot_path")
+            step = self._entry_to_step(entry, len(steps))
             
             # Extract URL from navigation events
-            if event_type == "navigation":
-                url = entry_data.get("url", url)
+            if step.event_type == "navigation":
+                url = step.data.get("url", url)
             
-            # Count decisions
-            if event_type == "decision":
-                total_decisions += 1
+            # Index decisions
+            if step.event_type == "decision":
+                decision_indices.append(len(steps))
             
             # Check for success
-            if event_type == "action_result" and entry_data.get("success"):
+            if step.event_type == "action_result" and step.data.get("success"):
                 success = True
             
-            step = ReplayStep(
-                step_number=entry.get("step", len(steps)),
-                timestamp=timestamp,
-                event_type=event_type,
-                message=message,
-                data=entry_data,
-                screenshot_path=screenshot,
-            )
             steps.append(step)
         
+        # The recorder's header is authoritative; steps fill in what it lacks
+        start_s = _epoch_seconds(metadata.get("start_time"))
+        end_s = _epoch_seconds(metadata.get("end_time"))
+        if start_s is None:
+            start_s = steps[0].timestamp_s if steps else time.time()
+        if end_s is None and steps:
+            end_s = steps[-1].timestamp_s
+        
         return ReplaySession(
             run_id=os.path.basename(self.report_dir),
-            url=url,
+            url=metadata.get("url") or url,
             goal=goal,
-            start_time=start_time or datetime.now(),
-            end_time=end_time,
+            start_s=start_s,
+            end_s=end_s,
             steps=steps,
             success=success,
-            total_decisions=total_decisions,
+            total_decisions=len(decision_indices),
+            decision_indices=decision_indices,
         )
     
+    @staticmethod
+    def _entry_to_step(entry: Dict[str, Any], index: int) -> ReplayStep:
+        """Convert one raw flight record entry into a ReplayStep."""
+        timestamp_s = _epoch_seconds(entry.get("timestamp"))
+        if timestamp_s is None:
+            timestamp_s = time.time()
+        
+        # Every field is passed positionally (step_number, timestamp_s,
+        # event_type, message, data, screenshot_path, screenshot_missing)
+        # so the generated __init__ never binds keywords or fills defaults
+        return ReplayStep(
+            entry.get("step", index),
+            timestamp_s,
+            # Decoders allocate a new str per value; interning shares one
+            # object per event type and makes the == checks identity hits
+            sys.intern(entry.get("event_type") or "unknown"),
+            entry.get("message", ""),
+            entry.get("data") or {},
+            entry.get("screenshot_path"),
+            False,
+        )
+    
+    def _require_session(self) -> ReplaySession:
+        """Return the loaded session, loading it on first use."""
+        return self.session or self.load()
+    
     def iterate_steps(self):
         """Iterate through all steps in the session."""
-        if not self.session:
-            self.load()
-        yield from self.session.steps
+        return iter(self._require_session().steps)
     
     def get_decisions(self) -> List[ReplayStep]:
         """Get only the decision steps from the session."""
-        if not self.session:
-            self.load()
-        return [s for s in self.session.steps if s.event_type == "decision"]
+        if self._decisions_cache is None:
+            session = self._require_session()
+            steps = session.steps
+            self._decisions_cache = [steps[i] for i in session.decision_indices]
+        return self._decisions_cache
     
     def get_step(self, index: int) -> Optional[ReplayStep]:
         """Get a specific step by index."""
-        if not self.session:
-            self.load()
-        if 0 <= index < len(self.session.steps):
-            return self.session.steps[index]
+        steps = self._require_session().steps
+        if 0 <= index < len(steps):
+            return steps[index]
         return None
     
     def next_step(self) -> Optional[ReplayStep]:
         """Get the next step in the sequence."""
-        step = self.get_step(self._current_step_index)
-        if step:
-            self._current_step_index += 1
-        return step
+        if self._step_iter is None:
+            self._step_iter = iter(self._require_session().steps)
+        return next(self._step_iter, None)
     
     def reset(self):
         """Reset the replay to the beginning."""
-        self._current_step_index = 0
+        self._step_iter = iter(self.session.steps) if self.session else None
     
     def print_summary(self):
-        """Print a summary of the replay session."""
-        if not self.session:
-            self.load()
-        
-        s = self.session
-        print("=" * 60)
-        print("🎬 SESSION REPLAY SUMMARY")
-        print("=" * 60)
-        print(f"Run ID:    {s.run_id}")
-        print(f"URL:       {s.url}")
-        print(f"Goal:      {s.goal}")
-        print(f"Duration:  {s.duration_seconds:.2f}s")
-        print(f"Steps:     {len(s.steps)}")
-        print(f"Decisions: {s.total_decisions}")
-        print(f"Success:   {'✅ Yes' if s.success else '❌ No'}")
-        print("-" * 60)
-        print("Decision Timeline:")
+        """
+        Print a summary of the replay session.
+        
+        The rendered text is cached next to the parsed session, so printing
+        the summary of an unchanged record again skips loading it. Once a
+        session is in memory it is rendered directly, since it may have
+        been built or changed without touching the files on disk.
+        """
+        cache_path = self._summary_cache_path() if self.session is None else None
+        if cache_path:
+            try:
+                with open(cache_path, encoding="utf-8") as f:
+                    sys.stdout.write(f.read())
+                return
+            except OSError:
+                pass
+        
+        text = self._render_summary() + "\n"
+        sys.stdout.write(text)
+        if cache_path:
+            _write_cache_file(cache_path, text.encode("utf-8"))
+    
+    def _summary_cache_path(self) -> Optional[str]:
+        """Cache file for the rendered summary of the current record."""
+        if not self.use_cache:
+            return None
+        source = self._record_source()
+        session_path = self._session_cache_path(source) if source else None
+        if session_path is None:
+            return None
+        return session_path[:-len(".replay.json")] + ".summary.txt"
+    
+    def _render_summary(self) -> str:
+        """Format the session summary as a single string."""
+        s = self._require_session()
+        lines = [
+            "=" * 60,
+            "🎬 SESSION REPLAY SUMMARY",
+            "=" * 60,
+            f"Run ID:    {s.run_id}",
+            f"URL:       {s.url}",
+            f"Goal:      {s.goal}",
+            f"Duration:  {s.duration_seconds:.2f}s",
+            f"Steps:     {len(s.steps)}",
+            f"Decisions: {s.total_decisions}",
+            f"Success:   {'✅ Yes' if s.success else '❌ No'}",
+            "-" * 60,
+            "Decision Timeline:",
+        ]
         
         for step in self.get_decisions():
-            conf_bar = "█" * int(step.confidence * 10) + "░" * (10 - int(step.confidence * 10))
-            print(f"  [{conf_bar}] {step.action.upper()} → {step.target[:40] if step.target else 'N/A'}")
+            lines.append(f"  [{confidence_bar(step.confidence)}] {step.action.upper()} → {step.target[:40] if step.target else 'N/A'}")
             if step.reasoning:
-                print(f"      └─ {step.reasoning[:50]}...")
+                lines.append(f"      └─ {step.reasoning[:50]}...")
         
-        print("=" * 60)
+        lines.append("=" * 60)
+        return "\n".join(lines)
     
-    def replay_on_browser(self, driver, step_mode: bool = False, callback=None):
+    def replay_on_browser(
+        self,
+        driver,
+        step_mode: bool = False,
+        callback=None,
+        batch_size: int = 1,
+        batch_min_confidence: float = 0.8,
+    ):
         """
         Re-execute the recorded actions on a live browser.
         
@@ -240,47 +644,141 @@ class SessionReplayer:
             driver: Selenium WebDriver instance
             step_mode: If True, pause after each step for inspection
             callback: Optional callback function called after each step
+            batch_size: Maximum number of decisions sent in one script
+                (see iter_replay_on_browser)
+            batch_min_confidence: Decisions below this confidence always go
+                through the executor
         
         Returns:
             List of (step, success) tuples
         """
-        from sentinel.layers.action import ActionExecutor
+        results = []
+        replay = self.iter_replay_on_browser(
+            driver,
+            batch_size=1 if step_mode else batch_size,
+            batch_min_confidence=batch_min_confidence,
+        )
+        for step, success in replay:
+            results.append((step, success))
+            
+            if callback:
+                callback(step, success)
+            
+            if step_mode:
+                input(f"Press Enter to continue to next step...")
+        
+        return results
+    
+    def iter_replay_on_browser(
+        self,
+        driver,
+        batch_size: int = 1,
+        batch_min_confidence: float = 0.8,
+    ):
+        """
+        Re-execute the recorded actions, yielding ``(step, success)`` as each completes.
         
-        if not self.session:
-            self.load()
+        Nothing runs between yields, so callers decide how to pause between
+        steps (prompt the user, diff screenshots, capture the DOM, ...).
         
+        With ``batch_size > 1``, runs of consecutive high-confidence type
+        decisions, optionally closed by one click, are sent to the browser in
+        a single script instead of one executor call each. Batched actions
+        skip the executor's stability waits and self-healing; typing clears
+        the field and sends per-character key events like the executor, so
+        batching suits in-page sequences such as form filling. A batch never
+        continues past a click, which may navigate. Any action the script
+        cannot resolve (or a non-input target such as contenteditable)
+        falls back to the executor.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            batch_size: Maximum number of decisions sent in one script
+            batch_min_confidence: Decisions below this confidence always go
+                through the executor
+        """
+        from sentinel.layers.action import ActionExecutor
+        from sentinel.layers.intelligence import Decision
+        
+        session = self._require_session()
         executor = ActionExecutor(driver)
-        results = []
         
         # Navigate to the URL first
-        if self.session.url:
-            logger.info(f"[SessionReplayer] Navigating to {self.session.url}")
-            driver.get(self.session.url)
+        if session.url:
+            logger.info(f"[SessionReplayer] Navigating to {session.url}")
+            driver.get(session.url)
         
-        for step in self.get_decisions():
+        decisions = self.get_decisions()
+        # The executor only reads the decision during execute(), so one
+        # scratch instance is refilled per step instead of allocating N
+        decision = Decision(action="", target="", reasoning="", confidence=0.0, metadata={})
+        i = 0
+        while i < len(decisions):
+            if batch_size > 1:
+                batch = self._collect_batch(decisions, i, batch_size, batch_min_confidence)
+                if len(batch) > 1:
+                    done = self._run_batch(driver, batch)
+                    for step in batch[:done]:
+                        logger.info(f"[SessionReplayer] Replayed (batched): {step.action} → {step.target}")
+                        yield step, True
+                    i += done
+                    if done:
+                        continue
+            
+            step = decisions[i]
+            i += 1
             logger.info(f"[SessionReplayer] Replaying: {step.action} → {step.target}")
             
-            # Create a mock decision for the executor
-            from sentinel.layers.intelligence import Decision
-            decision = Decision(
-                action=step.action,
-                target=step.target or "",
-                reasoning=f"Replay: {step.reasoning}",
-                confidence=step.confidence,
-                metadata=step.data.get("metadata", {}),
-            )
+            # Point the scratch decision at this step
+            decision.action = step.action
+            decision.target = step.target or ""
+            decision.reasoning = f"Replay: {step.reasoning}"
+            decision.confidence = step.confidence
+            decision.metadata = step.data.get("metadata", {})
             
             # Execute the action
-            success = executor.execute(decision)
-            results.append((step, success))
-            
-            if callback:
-                callback(step, success)
-            
-            if step_mode:
-                input(f"Press Enter to continue to next step...")
+            yield step, executor.execute(decision)
+    
+    @staticmethod
+    def _collect_batch(
+        decisions: List[ReplayStep],
+        start: int,
+        batch_size: int,
+        min_confidence: float,
+    ) -> List[ReplayStep]:
+        """
+        Collect consecutive batchable decisions starting at ``start``.
         
-        return results
+        A click closes the batch: anything after it may run on a new document.
+        """
+        batch = []
+        for step in decisions[start:start + batch_size]:
+            action = (step.action or "").lower()
+            if action not in _BATCHABLE_ACTIONS or not step.target:
+                break
+            if step.confidence < min_confidence:
+                break
+            batch.append(step)
+            if action == "click":
+                break
+        return batch
+    
+    @staticmethod
+    def _run_batch(driver, batch: List[ReplayStep]) -> int:
+        """Run a batch in one script; returns how many actions completed."""
+        payload = [
+            {
+                "action": step.action.lower(),
+                "target": step.target,
+                "value": (step.data.get("metadata") or {}).get("text", ""),
+            }
+            for step in batch
+        ]
+        try:
+            return int(driver.execute_script(_REPLAY_BATCH_JS, payload) or 0)
+        except Exception as e:
+            logger.debug(f"[SessionReplayer] Batch replay failed ({e})")
+            return 0
 
 
 def replay_command(report_dir: str, step_mode: bool = False, rerun: bool = False):
@@ -317,3 +815,11 @@ def replay_command(report_dir: str, step_mode: bool = False, rerun: bool = False
                 print(f"  {status} {step.action} → {step.target[:40] if step.target else 'N/A'}")
         finally:
             driver.quit()
+
+
+if __name__ == "__main__":
+    # Summary-only entry point: python -m sentinel.reporters.session_replayer <report_dir>
+    if len(sys.argv) != 2:
+        print("Usage: python -m sentinel.reporters.session_replayer <report_dir>")
+        sys.exit(2)
+    replay_command(sys.argv[1])
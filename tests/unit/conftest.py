@@ -0,0 +1,29 @@
+"""
+Shared fixtures for the unit tests.
+
+The suite can run in parallel with ``pytest -n auto`` (pytest-xdist).
+Session- and module-scoped fixtures are per worker process: files come from
+tmp_path_factory, which gives each worker its own base directory, and the
+shared mock agent is never visible across workers.
+"""
+
+import pytest
+
+from sentinel.layers.sense.visual_agent import VisualAgent
+
+
+@pytest.fixture(scope="session")
+def fake_png(tmp_path_factory):
+    """Path to a placeholder screenshot, created once per session.
+
+    The mock backend only checks that the file exists, so it is left empty.
+    """
+    path = tmp_path_factory.mktemp("visual_agent") / "fake.png"
+    path.touch()
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def mock_agent():
+    """A mock-backend VisualAgent shared by the tests of one module (per worker)."""
+    return VisualAgent(backend="mock")
@@ -0,0 +1,59 @@
+"""
+Unit tests for the per-user disk cache directory.
+"""
+
+import os
+
+import pytest
+
+from sentinel.core import disk_cache
+
+posix_only = pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+
+
+@pytest.fixture
+def temp_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache.tempfile, "gettempdir", lambda: str(tmp_path))
+    return tmp_path
+
+
+class TestCacheDir:
+    """Test creation and ownership checks of the cache directory."""
+
+    @posix_only
+    def test_created_private(self, temp_root):
+        """Test the directory is per user and not accessible to others."""
+        path = disk_cache.cache_dir()
+        assert os.path.basename(path) == f"sentinel_cache-{os.getuid()}"
+        assert os.stat(path).st_mode & 0o077 == 0
+
+    @posix_only
+    def test_shared_directory_rejected(self, temp_root):
+        """Test a pre-existing directory others can write to is not used."""
+        path = temp_root / f"sentinel_cache-{os.getuid()}"
+        path.mkdir()
+        path.chmod(0o777)
+        assert disk_cache.cache_dir() is None
+
+    @posix_only
+    def test_symlink_rejected(self, temp_root):
+        """Test a symlink planted at the cache path is not followed."""
+        target = temp_root / "elsewhere"
+        target.mkdir(mode=0o700)
+        (temp_root / f"sentinel_cache-{os.getuid()}").symlink_to(target)
+        assert disk_cache.cache_dir() is None
+
+
+class TestPrune:
+    """Test bounding the number of cached files."""
+
+    def test_oldest_files_removed(self, tmp_path):
+        """Test only the newest max_files entries survive."""
+        for i in range(5):
+            path = tmp_path / f"{i}.json"
+            path.write_text("{}")
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+
+        disk_cache.prune_cache_dir(str(tmp_path), max_files=2)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["3.json", "4.json"]
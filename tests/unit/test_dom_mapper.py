@@ -0,0 +1,170 @@
+import json
+import shutil
+import subprocess
+from unittest.mock import MagicMock
+
+import pytest
+
+from sentinel.layers.sense import dom_mapper
+from sentinel.layers.sense.dom_mapper import DOMMapper, ElementNode
+
+
+def _make_node(idx, tag="button", text="Submit", cls="btn"):
+    return ElementNode(
+        id=f"id-{idx}",
+        tag=tag,
+        text=text,
+        selector=f"#el-{idx}",
+        attributes={"class": cls},
+    )
+
+
+def test_short_hash_is_stable_and_short():
+    """Element IDs are 12-char hex digests, stable for the same signature."""
+    first = dom_mapper._short_hash("button_login_btn_Login_0")
+    second = dom_mapper._short_hash("button_login_btn_Login_0")
+    other = dom_mapper._short_hash("button_login_btn_Login_1")
+
+    assert first == second
+    assert first != other
+    assert len(first) == 12
+    int(first, 16)
+
+
+def test_short_hash_md5_fallback(monkeypatch):
+    """Without xxhash installed the mapper falls back to hashlib."""
+    monkeypatch.setattr(dom_mapper, "xxhash", None)
+    assert len(dom_mapper._short_hash("button__Login_0")) == 12
+
+
+def test_page_snapshot_tracks_structure():
+    """Snapshot changes when the structural signals change."""
+    driver = MagicMock()
+    driver.current_url = "https://example.com"
+    mapper = DOMMapper(driver)
+
+    mapper.get_world_state = MagicMock(return_value=[_make_node(0), _make_node(1)])
+    before = mapper.get_page_snapshot()
+    assert before == mapper.get_page_snapshot()
+
+    mapper.get_world_state = MagicMock(return_value=[_make_node(0)])
+    assert mapper.get_page_snapshot() != before
+
+
+def test_element_str_is_memoized():
+    """The prompt string is computed once and reused."""
+    node = _make_node(0, text="Sign in")
+    first = str(node)
+    assert first == '<button class="btn">Sign in</button>'
+    assert str(node) is first
+
+
+def test_to_dict_skip_empty():
+    """skip_empty drops None/empty fields but keeps booleans."""
+    data = _make_node(0).to_dict(skip_empty=True)
+    assert "shadow_path" not in data
+    assert "bounding_box" not in data
+    assert "context_text" not in data
+    assert data["is_visible"] is True
+    assert len(_make_node(0).to_dict()) == 11
+
+
+def test_find_by_text_uses_cached_index():
+    """Lookups without refresh reuse the last world state."""
+    mapper = DOMMapper(MagicMock())
+    login = _make_node(0, text="Log In")
+    dup = _make_node(1, text="log in")
+    signup = _make_node(2, text="Sign up for free")
+    mapper._map_standard_dom = MagicMock(return_value=[login, dup, signup])
+    mapper._has_lumos = False
+    mapper.driver.current_url = "https://example.com"
+
+    assert mapper.find_by_text("LOG IN") is login
+    assert mapper.find_by_text("sign up", refresh=False) is signup
+    assert mapper.find_by_text("missing", refresh=False) is None
+    assert mapper._map_standard_dom.call_count == 1
+
+
+def test_element_to_node_visibility_shortcuts():
+    """Known visibility skips is_displayed; hidden elements can bail early."""
+    mapper = DOMMapper(MagicMock())
+    element = MagicMock()
+    element.tag_name = "button"
+    element.text = " Go "
+    element.get_attribute.return_value = None
+    element.rect = {"x": 0, "y": 0, "width": 10, "height": 10}
+    mapper.driver.execute_script.return_value = {"selector": "#go", "context": ""}
+
+    node = mapper._element_to_node(element, 0, assume_visible=True)
+    assert node.is_visible and node.text == "Go"
+    element.is_displayed.assert_not_called()
+
+    element.get_attribute.reset_mock()
+    element.is_displayed.return_value = False
+    assert mapper._element_to_node(element, 1, skip_hidden=True) is None
+    element.get_attribute.assert_not_called()
+
+
+def test_find_by_role_limit():
+    """limit stops at the first k matches."""
+    mapper = DOMMapper(MagicMock())
+    mapper._world_state = [
+        _make_node(0),
+        _make_node(1, tag="a"),
+        _make_node(2),
+    ]
+
+    assert len(mapper.find_by_role("button", refresh=False)) == 2
+    assert mapper.find_by_role("button", limit=1, refresh=False) == [mapper._world_state[0]]
+
+
+def test_init_does_not_patch_attach_shadow():
+    """Only the mapper is pre-installed; page prototypes are left untouched."""
+    driver = MagicMock()
+    DOMMapper(driver)
+
+    sources = [c.args[1]["source"] for c in driver.execute_cdp_cmd.call_args_list]
+    assert len(sources) == 1
+    assert "__sentinelMap" in sources[0]
+    assert "attachShadow" not in sources[0]
+
+
+# Minimal DOM for running the mapper under node: two buttons sharing a
+# data-testid plus a heading that also matches the interactive selector
+_FAKE_DOM_JS = r"""
+const mk = (tag, attrs, text) => ({
+    tagName: tag.toUpperCase(), nodeType: 1, innerText: text, id: attrs.id || '',
+    className: attrs.class || '', parentNode: null, parentElement: null,
+    previousElementSibling: null, children: [],
+    getAttribute: (k) => (k in attrs ? attrs[k] : null),
+    getBoundingClientRect: () => ({left: 0, top: 0, width: 10, height: 10}),
+    checkVisibility: () => true,
+    querySelectorAll: () => [],
+    contains: () => false,
+});
+const a = mk('button', {'data-testid': 'buy'}, 'Buy A');
+const b = mk('button', {'data-testid': 'buy'}, 'Buy B');
+const h = mk('h2', {role: 'button'}, 'Title');
+global.window = global;
+global.Node = {ELEMENT_NODE: 1};
+global.CSS = {escape: (v) => v};
+global.document = {
+    querySelectorAll: (sel) => (sel.startsWith('h1') ? [h] : [a, b, h]),
+};
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+def test_mapper_keeps_elements_sharing_a_selector():
+    """Distinct nodes with the same selector are kept; headings are not doubled."""
+    script = (
+        _FAKE_DOM_JS
+        + dom_mapper._UNIFIED_MAPPER_JS
+        + "console.log(JSON.stringify(window.__sentinelMap('*')));"
+    )
+    out = subprocess.run(
+        ["node", "-e", script], capture_output=True, text=True, check=True
+    ).stdout
+
+    texts = [r["text"] for r in json.loads(out)]
+    assert texts == ["Buy A", "Buy B", "Title"]
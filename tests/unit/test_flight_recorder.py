@@ -0,0 +1,216 @@
+"""
+Unit tests for FlightRecorder.
+
+Covers the NDJSON sidecar and the consolidated JSON log.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from sentinel.reporters import flight_recorder
+from sentinel.reporters.flight_recorder import FlightRecorder
+
+
+def _read_ndjson(recorder):
+    with open(recorder.ndjson_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestEntryStreaming:
+    """Test entries are streamed to the sidecar as they are logged."""
+
+    def test_entries_written_incrementally(self, tmp_path):
+        """Test earlier entries reach the sidecar before the report is built."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder.log_navigation("https://example.com")
+        recorder.log_info("first")
+        recorder.log_warning("second")
+        recorder.flush()
+
+        lines = _read_ndjson(recorder)
+        assert [e["event_type"] for e in lines] == ["navigation", "info", "warning"]
+        recorder.close()
+
+    def test_screenshot_attached_to_latest_entry(self, tmp_path):
+        """Test a screenshot taken after logging is kept in the streamed entry."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder._glow = None
+        recorder.log_info("before click")
+
+        class Driver:
+            def save_screenshot(self, path):
+                open(path, "wb").close()
+
+        path = recorder.capture_screenshot("shot", driver=Driver())
+        recorder.log_info("after click")
+        recorder.flush()
+
+        lines = _read_ndjson(recorder)
+        assert lines[0]["screenshot_path"] == path
+        assert lines[1]["screenshot_path"] is None
+        recorder.close()
+
+    def test_report_json_consolidates_sidecar(self, tmp_path):
+        """Test flight_record.json holds metadata and every logged entry."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder._glow = None
+        recorder.log_navigation("https://example.com")
+        recorder.log_error("boom", ValueError("bad"))
+
+        recorder.generate_report()
+
+        with open(os.path.join(recorder.run_dir, "flight_record.json"), encoding="utf-8") as f:
+            record = json.load(f)
+        assert record["metadata"]["url"] == "https://example.com"
+        assert [e["message"] for e in record["entries"]] == [
+            "Navigated to https://example.com",
+            "boom",
+        ]
+        assert record["entries"][1]["data"] == {"exception": "bad"}
+        recorder.close()
+
+    def test_screenshot_after_flush_rewrites_sidecar_line(self, tmp_path):
+        """Test a screenshot for an already-written entry reaches the sidecar."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder._glow = None
+        recorder.log_info("first")
+        recorder.log_info("clicked")
+        recorder.generate_report()
+
+        class Driver:
+            def save_screenshot(self, path):
+                open(path, "wb").close()
+
+        path = recorder.capture_screenshot("shot", driver=Driver())
+        recorder.log_info("next")
+        recorder.generate_report()
+
+        lines = _read_ndjson(recorder)
+        assert [e["message"] for e in lines] == ["first", "clicked", "next"]
+        assert lines[1]["screenshot_path"] == path
+        with open(os.path.join(recorder.run_dir, "flight_record.json"), encoding="utf-8") as f:
+            record = json.load(f)
+        assert record["entries"][1]["screenshot_path"] == path
+        recorder.close()
+
+    def test_entries_logged_after_close_reach_sidecar(self, tmp_path, caplog):
+        """Test logging after close() appends to the sidecar with a warning."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder.log_info("before")
+        recorder.close()
+
+        with caplog.at_level("WARNING", logger=flight_recorder.__name__):
+            recorder.log_info("late one")
+            recorder.log_info("late two")
+
+        lines = _read_ndjson(recorder)
+        assert [e["message"] for e in lines] == ["before", "late one", "late two"]
+        assert "after close()" in caplog.text
+
+
+class TestJsonEncoding:
+    """Test the orjson/stdlib serializer wrapper."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_datetimes_encoded_as_isoformat(self, monkeypatch, use_orjson):
+        """Test both encoders emit ISO timestamps and stringify unknown values."""
+        if use_orjson and flight_recorder.orjson is None:
+            pytest.skip("orjson not installed")
+        if not use_orjson:
+            monkeypatch.setattr(flight_recorder, "orjson", None)
+
+        stamp = datetime(2024, 1, 2, 3, 4, 5)
+        decoded = json.loads(flight_recorder._dumps({"t": stamp, "x": object}))
+        assert decoded["t"] == "2024-01-02T03:04:05"
+        assert decoded["x"].startswith("<class")
+
+
+class TestHtmlReport:
+    """Test the streamed fallback HTML report."""
+
+    def test_report_contains_every_entry(self, tmp_path):
+        """Test streamed HTML matches the in-memory build and lists all entries."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder._glow = None
+        for i in range(3):
+            recorder.log_info(f"message {i}")
+
+        report_path = recorder.generate_report()
+
+        with open(report_path, encoding="utf-8") as f:
+            html = f.read()
+        assert html == recorder._build_html_report()
+        assert html.rstrip().endswith("</html>")
+        assert all(f"message {i}" in html for i in range(3))
+        recorder.close()
+
+    def test_screenshot_paths_relative_to_run_dir(self, tmp_path):
+        """Test own screenshots link via the cached prefix and others via relpath."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder.log_info("own")
+        recorder.entries[-1].screenshot_path = os.path.join(recorder.screenshots_dir, "a.png")
+        recorder.log_info("external")
+        recorder.entries[-1].screenshot_path = os.path.join(recorder.run_dir, "other", "b.png")
+
+        html = recorder._build_html_report()
+        assert 'src="screenshots/a.png" class="timeline-screenshot" loading="lazy"' in html
+        assert f'src="{os.path.join("other", "b.png")}"' in html
+        recorder.close()
+
+
+class TestLogEntryTimestamp:
+    """Test LogEntry keeps integer timestamps and formats on demand."""
+
+    def test_timestamp_property_from_ns(self):
+        """Test the datetime view is derived from the stored nanoseconds."""
+        stamp = datetime(2024, 1, 2, 3, 4, 5, 678901)
+        ns = int(stamp.timestamp()) * 1_000_000_000 + 678901 * 1000 + 999
+        entry = flight_recorder.LogEntry(timestamp_ns=ns, step=0, event_type="info", message="m")
+        assert entry.timestamp == stamp
+
+    def test_stats_use_running_counters(self, tmp_path):
+        """Test decision and action totals are tracked as entries are logged."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder._glow = None
+        recorder.log_action_result(1, True)
+        recorder.log_action_result(2, False, error="nope")
+        recorder.log_action_result(3, True)
+
+        assert recorder._counts["action_success"] == 2
+        assert recorder._counts["action_failed"] == 1
+        recorder.generate_report()
+        assert recorder.metadata["total_steps"] == 0
+        recorder.close()
+
+    def test_screenshot_dimensions_from_image_header(self, tmp_path):
+        """Test width/height are emitted when the image can be read."""
+        Image = pytest.importorskip("PIL.Image")
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        path = os.path.join(recorder.screenshots_dir, "shot.png")
+        Image.new("RGB", (64, 32)).save(path)
+
+        tag = recorder._screenshot_tag(path, "screenshots/shot.png")
+        assert 'width="64" height="32"' in tag
+        assert 'decoding="async"' in tag
+        recorder.close()
+
+
+class TestFormatData:
+    """Test inline data filtering in the timeline."""
+
+    @pytest.mark.parametrize("value", [
+        list(range(5)),
+        {"a": 1},
+        [],
+        "x" * 500,
+        list(range(67)),
+        list(range(1000)),
+        {str(i): i for i in range(40)},
+    ])
+    def test_matches_repr_length_rule(self, value):
+        """Test containers are kept exactly when their repr is under 200 chars."""
+        expected = not isinstance(value, (list, dict)) or len(str(value)) < 200
+        assert FlightRecorder._fits_inline(value) is expected
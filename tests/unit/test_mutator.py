@@ -0,0 +1,160 @@
+"""
+Unit tests for UIMutator.
+
+The browser is mocked; these tests cover the JavaScript fallback path.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from sentinel.layers.validation.mutator import (
+    UIMutator,
+    _APPLY_MUTATION_JS,
+    _ELEMENT_REGISTRY_JS,
+    _REVERT_MUTATION_JS,
+)
+
+
+def _mutator(result=None):
+    driver = MagicMock()
+    driver.execute_script.return_value = result
+    mutator = UIMutator(driver)
+    mutator._vandal = None
+    return mutator, driver
+
+
+class TestFallbackMutation:
+    """Test the parametrized apply/revert scripts."""
+
+    @pytest.mark.parametrize("strategy", UIMutator.MUTATION_STRATEGIES)
+    def test_every_strategy_uses_shared_script(self, strategy):
+        """Test each strategy is one call with selector and strategy as arguments."""
+        mutator, driver = _mutator(["state"])
+        mutation = mutator.apply_mutation("#submit", strategy)
+
+        driver.execute_script.assert_called_once_with(_APPLY_MUTATION_JS, "#submit", strategy)
+        assert mutation.mutation_type == strategy
+        assert mutation.original_state == "state"
+
+    def test_selector_is_not_interpolated(self):
+        """Test quotes in a selector cannot break out of the script."""
+        mutator, driver = _mutator()
+        selector = "a[href='x'], '); alert(1); ('"
+        mutator.apply_mutation(selector, "ghost_element")
+
+        script = driver.execute_script.call_args[0][0]
+        assert selector not in script
+        assert driver.execute_script.call_args[0][1] == selector
+
+    def test_falsy_original_state_is_none(self):
+        """Test a falsy original state is stored as None."""
+        mutator, _ = _mutator([False])
+        mutation = mutator.apply_mutation("#submit", "stealth_disable")
+        assert mutation.original_state is None
+
+    def test_script_error_returns_failed_mutation(self):
+        """Test a JS error yields a 'failed' mutation."""
+        mutator, driver = _mutator()
+        driver.execute_script.side_effect = Exception("el is null")
+        mutation = mutator.apply_mutation("#missing", "ui_shift")
+        assert mutation.name == "failed"
+
+    def test_registry_injected_when_missing(self):
+        """Test the element registry is injected once if the page lacks it."""
+        mutator, driver = _mutator()
+        driver.execute_script.side_effect = [None, None, ["hidden"]]
+        mutation = mutator.apply_mutation("#submit", "ghost_element")
+
+        assert driver.execute_script.call_args_list[1][0] == (_ELEMENT_REGISTRY_JS,)
+        assert driver.execute_script.call_count == 3
+        assert mutation.original_state == "hidden"
+
+    def test_revert_passes_original_state(self):
+        """Test revert sends selector, strategy and original state as arguments."""
+        mutator, driver = _mutator(["5px"])
+        mutation = mutator.apply_mutation("#submit", "ui_shift")
+
+        assert mutator.revert_mutation(mutation) is True
+        driver.execute_script.assert_called_with(_REVERT_MUTATION_JS, "#submit", "ui_shift", "5px")
+        assert mutation.reverted
+
+
+class TestParallelMutationRun:
+    """Test run_mutation_test sharding across driver sessions."""
+
+    def test_budget_is_sharded_across_workers(self):
+        """Test each worker gets its own driver and the budget is split."""
+        drivers = []
+
+        def factory():
+            driver = MagicMock()
+            driver.execute_script.return_value = ["orig"]
+            drivers.append(driver)
+            return driver
+
+        seen = []
+        mutator, _ = _mutator()
+        results = mutator.run_mutation_test(
+            lambda driver: seen.append(driver) or True,
+            selectors=["#a"],
+            num_mutations=5,
+            driver_factory=factory,
+            workers=2,
+        )
+
+        assert len(results) == 5
+        assert len(drivers) == 2
+        assert set(map(id, seen)) == set(map(id, drivers))
+        for driver in drivers:
+            driver.quit.assert_called_once()
+
+    def test_driver_quit_when_test_raises(self):
+        """Test a failing test counts as detected and the session is closed."""
+        driver = MagicMock()
+        mutator, _ = _mutator()
+
+        def boom(_driver):
+            raise RuntimeError("element not found")
+
+        results = mutator.run_mutation_test(
+            boom, selectors=["#a"], num_mutations=2,
+            driver_factory=lambda: driver, workers=1,
+        )
+
+        assert all(r.test_detected for r in results)
+        driver.quit.assert_called_once()
+
+    def test_empty_budget_opens_no_session(self):
+        """Test num_mutations=0 returns no results without creating a driver."""
+        factory = MagicMock()
+        mutator, _ = _mutator()
+
+        results = mutator.run_mutation_test(
+            lambda driver: True, selectors=["#a"], num_mutations=0,
+            driver_factory=factory, workers=4,
+        )
+
+        assert results == []
+        factory.assert_not_called()
+
+
+class TestSelectorCache:
+    """Test reuse of the interactive-element scan between random mutations."""
+
+    def test_scan_reused_until_url_changes(self):
+        """Test the page is scanned once per URL and after invalidation."""
+        mutator, driver = _mutator()
+        driver.current_url = "https://example.com/a"
+        driver.execute_script.return_value = ["#login"]
+
+        assert mutator._find_random_interactive_element() == "#login"
+        assert mutator._find_random_interactive_element() == "#login"
+        assert driver.execute_script.call_count == 1
+
+        driver.current_url = "https://example.com/b"
+        mutator._find_random_interactive_element()
+        assert driver.execute_script.call_count == 2
+
+        mutator.invalidate_selector_cache()
+        mutator._find_random_interactive_element()
+        assert driver.execute_script.call_count == 3
@@ -0,0 +1,31 @@
+"""
+Unit tests for persistent page script registration.
+"""
+
+from unittest.mock import MagicMock
+
+from sentinel.core.page_scripts import register_page_script
+
+
+class TestRegisterPageScript:
+    """Test CDP registration is done once per driver and script."""
+
+    def test_script_registered_once_per_driver(self):
+        """Test repeated registrations on one driver send a single CDP command."""
+        driver = MagicMock()
+        assert register_page_script(driver, "window.a = 1;") is True
+        assert register_page_script(driver, "window.a = 1;") is True
+        assert register_page_script(driver, "window.b = 2;") is True
+        assert driver.execute_cdp_cmd.call_count == 2
+
+        other = MagicMock()
+        register_page_script(other, "window.a = 1;")
+        other.execute_cdp_cmd.assert_called_once()
+
+    def test_missing_cdp_remembered(self):
+        """Test drivers without CDP are not retried on every registration."""
+        driver = MagicMock()
+        driver.execute_cdp_cmd.side_effect = Exception("no CDP")
+        assert register_page_script(driver, "window.a = 1;") is False
+        assert register_page_script(driver, "window.a = 1;") is False
+        driver.execute_cdp_cmd.assert_called_once()
@@ -0,0 +1,457 @@
+"""
+Unit tests for SessionReplayer.
+
+Flight records are produced by FlightRecorder so both sides stay in sync.
+"""
+
+import json
+import os
+
+import pytest
+
+from sentinel.core import disk_cache
+from sentinel.reporters import session_replayer
+from sentinel.reporters.flight_recorder import FlightRecorder
+from sentinel.reporters.session_replayer import SessionReplayer
+
+
+@pytest.fixture
+def report_dir(tmp_path):
+    recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+    recorder._glow = None
+    recorder.log_navigation("https://example.com")
+    recorder.log_info("looking around")
+    recorder.log_action_result(1, True)
+    recorder.generate_report()
+    recorder.close()
+    return recorder.run_dir
+
+
+class TestLoad:
+    """Test loading flight records with and without ijson."""
+
+    @pytest.mark.parametrize("loader", ["ijson", "orjson", "json"])
+    def test_load_parses_entries(self, report_dir, monkeypatch, loader):
+        """Test streamed and whole-file loads build the same session."""
+        if loader == "ijson" and session_replayer.ijson is None:
+            pytest.skip("ijson not installed")
+        if loader == "orjson" and session_replayer._loads is json.loads:
+            pytest.skip("orjson not installed")
+        if loader != "ijson":
+            monkeypatch.setattr(session_replayer, "ijson", None)
+        if loader == "json":
+            monkeypatch.setattr(session_replayer, "_loads", json.loads)
+        os.remove(os.path.join(report_dir, "entries.ndjson"))
+
+        session = SessionReplayer(report_dir, use_cache=False).load()
+
+        assert session.run_id == "run"
+        assert session.url == "https://example.com"
+        assert [s.event_type for s in session.steps] == ["navigation", "info", "action"]
+        assert session.start_time <= session.end_time
+        assert session.steps[2].data["success"] is True
+
+    def test_prefers_ndjson_sidecar(self, report_dir):
+        """Test the recorder's NDJSON sidecar is loaded line by line when present."""
+        os.remove(os.path.join(report_dir, "flight_record.json"))
+
+        session = SessionReplayer(report_dir, use_cache=False).load()
+
+        assert session.url == "https://example.com"
+        assert [s.event_type for s in session.steps] == ["navigation", "info", "action"]
+
+    def test_sidecar_uses_record_header(self, tmp_path):
+        """Test goal, URL and times come from flight_record.json when loading the sidecar."""
+        recorder = FlightRecorder(output_dir=str(tmp_path), run_name="run")
+        recorder._glow = None
+        recorder.metadata["goal"] = "Login please"
+        recorder.log_navigation("https://example.com/login")
+        recorder.generate_report()
+        recorder.close()
+
+        session = SessionReplayer(os.path.join(tmp_path, "run"), use_cache=False).load()
+
+        assert session.goal == "Login please"
+        assert session.url == "https://example.com/login"
+        assert session.start_s == session_replayer._epoch_seconds(recorder.metadata["start_time"])
+        assert session.end_s == session_replayer._epoch_seconds(recorder.metadata["end_time"])
+
+    def test_truncated_last_line_is_dropped(self, report_dir):
+        """Test a partial trailing line from a crashed run does not abort loading."""
+        with open(os.path.join(report_dir, "entries.ndjson"), "a", encoding="utf-8") as f:
+            f.write('{"timestamp": "2024-01-02T03:04:05", "event_ty')
+
+        session = SessionReplayer(report_dir, use_cache=False).load()
+        assert [s.event_type for s in session.steps] == ["navigation", "info", "action"]
+
+    def test_corrupt_middle_line_raises(self, report_dir):
+        """Test only a bad final line is tolerated."""
+        path = os.path.join(report_dir, "entries.ndjson")
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+        lines.insert(1, "{not json\n")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+        with pytest.raises(ValueError):
+            SessionReplayer(report_dir, use_cache=False).load()
+
+    def test_missing_record_raises(self, tmp_path):
+        """Test a directory without flight_record.json raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            SessionReplayer(str(tmp_path)).load()
+
+    def test_floats_stay_floats_when_streaming(self, tmp_path):
+        """Test ijson yields floats rather than Decimals for confidence values."""
+        if session_replayer.ijson is None:
+            pytest.skip("ijson not installed")
+        record = {
+            "metadata": {"goal": "click login"},
+            "entries": [{
+                "timestamp": "2024-01-02T03:04:05",
+                "step": 1,
+                "event_type": "decision",
+                "message": "m",
+                "data": {"action": "click", "target": "#login", "confidence": 0.75},
+            }],
+        }
+        with open(os.path.join(tmp_path, "flight_record.json"), "w") as f:
+            json.dump(record, f)
+
+        session = SessionReplayer(str(tmp_path), use_cache=False).load()
+        assert session.goal == "click login"
+        assert session.total_decisions == 1
+        assert type(session.steps[0].confidence) is float
+
+
+class TestSessionCache:
+    """Test the parsed-session cache."""
+
+    @pytest.fixture(autouse=True)
+    def _cache_dir(self, tmp_path, monkeypatch):
+        cache_root = tmp_path / "cache_root"
+        cache_root.mkdir()
+        monkeypatch.setattr(disk_cache.tempfile, "gettempdir", lambda: str(cache_root))
+
+    def test_second_load_skips_parsing(self, report_dir, monkeypatch):
+        """Test an unchanged record is served from the cache."""
+        first = SessionReplayer(report_dir).load()
+
+        replayer = SessionReplayer(report_dir)
+        monkeypatch.setattr(replayer, "_parse_record_file", lambda: pytest.fail("re-parsed"))
+        second = replayer.load()
+
+        assert [s.message for s in second.steps] == [s.message for s in first.steps]
+
+    def test_rewritten_report_header_is_reparsed(self, report_dir):
+        """Test a new flight_record.json header invalidates a sidecar-based cache."""
+        assert SessionReplayer(report_dir).load().goal == "Unknown goal"
+
+        path = os.path.join(report_dir, "flight_record.json")
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        record["metadata"]["goal"] = "Login please"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+
+        assert SessionReplayer(report_dir).load().goal == "Login please"
+
+    def test_cache_entry_is_plain_json(self, report_dir):
+        """Test the cached session is JSON data, never a pickle."""
+        replayer = SessionReplayer(report_dir)
+        replayer.load()
+
+        cache_path = replayer._session_cache_path(replayer._record_source())
+        with open(cache_path, encoding="utf-8") as f:
+            assert isinstance(json.load(f), list)
+
+    def test_modified_record_is_reparsed(self, report_dir):
+        """Test changing the record invalidates the cache."""
+        SessionReplayer(report_dir).load()
+
+        path = os.path.join(report_dir, "entries.ndjson")
+        with open(path, encoding="utf-8") as f:
+            first = f.readline()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(first)
+
+        assert len(SessionReplayer(report_dir).load().steps) == 1
+
+    def test_summary_reused_for_unchanged_record(self, report_dir, capsys):
+        """Test a cached summary is printed without loading the session."""
+        SessionReplayer(report_dir).print_summary()
+        first = capsys.readouterr().out
+
+        replayer = SessionReplayer(report_dir)
+        replayer.load = lambda *a, **kw: pytest.fail("re-loaded")
+        replayer.print_summary()
+
+        assert capsys.readouterr().out == first
+
+    def test_summary_follows_report_header(self, report_dir, capsys):
+        """Test rewriting flight_record.json invalidates the cached summary."""
+        SessionReplayer(report_dir).print_summary()
+        capsys.readouterr()
+
+        path = os.path.join(report_dir, "flight_record.json")
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        record["metadata"]["goal"] = "Login please"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+
+        SessionReplayer(report_dir).print_summary()
+        assert "Goal:      Login please" in capsys.readouterr().out
+
+    def test_in_memory_session_bypasses_summary_cache(self, report_dir, capsys):
+        """Test a session changed in memory is rendered, not read from the cache."""
+        SessionReplayer(report_dir).print_summary()
+        capsys.readouterr()
+
+        replayer = SessionReplayer(report_dir)
+        replayer.load().goal = "Edited goal"
+        replayer.print_summary()
+
+        assert "Goal:      Edited goal" in capsys.readouterr().out
+
+
+class TestDecisions:
+    """Test decision lookup through the parse-time index."""
+
+    def test_decisions_indexed_at_parse_time(self, tmp_path):
+        """Test get_decisions() returns decision steps in order and is memoized."""
+        entries = [
+            {"timestamp": "2024-01-02T03:04:05", "event_type": t, "message": str(i), "data": {}}
+            for i, t in enumerate(["navigation", "decision", "action", "decision"])
+        ]
+        with open(os.path.join(tmp_path, "flight_record.json"), "w") as f:
+            json.dump({"metadata": {}, "entries": entries}, f)
+
+        replayer = SessionReplayer(str(tmp_path), use_cache=False)
+        replayer.load()
+
+        assert replayer.session.decision_indices == [1, 3]
+        assert replayer.session.confidences == [0.0, 0.0]
+        assert replayer.session.total_decisions == 2
+        decisions = replayer.get_decisions()
+        assert [d.message for d in decisions] == ["1", "3"]
+        assert replayer.get_decisions() is decisions
+
+
+class TestTimestampParsing:
+    """Test ISO timestamp parsing with and without ciso8601."""
+
+    @pytest.mark.parametrize("value, expected", [
+        ("2024-01-02T03:04:05.678901", (2024, 1, 2, 3, 4, 5, 678901)),
+        ("2024-01-02T03:04:05Z", (2024, 1, 2, 3, 4, 5, 0)),
+    ])
+    def test_parses_iso_formats(self, value, expected):
+        """Test naive and 'Z'-suffixed timestamps are accepted."""
+        parsed = session_replayer._parse_timestamp(value)
+        assert (parsed.year, parsed.month, parsed.day, parsed.hour,
+                parsed.minute, parsed.second, parsed.microsecond) == expected
+
+    def test_bad_timestamp_falls_back_to_now(self):
+        """Test unparseable timestamps do not abort loading."""
+        step = SessionReplayer._entry_to_step({"timestamp": "yesterday"}, 0)
+        assert step.timestamp is not None
+        step = SessionReplayer._entry_to_step({"timestamp": None}, 0)
+        assert step.timestamp is not None
+        step = SessionReplayer._entry_to_step({"timestamp": "2024-13-45T00:00:00"}, 0)
+        assert step.timestamp is not None
+
+
+class TestBatchedReplay:
+    """Test replay_on_browser batching of consecutive decisions."""
+
+    @pytest.fixture
+    def replayer(self, tmp_path):
+        def decision(action, target, confidence=0.9, text=None):
+            data = {"action": action, "target": target, "confidence": confidence}
+            if text is not None:
+                data["metadata"] = {"text": text}
+            return {"timestamp": "2024-01-02T03:04:05", "event_type": "decision",
+                    "message": target, "data": data}
+
+        entries = [
+            decision("type", "#user", text="alice"),
+            decision("type", "#pass", text="secret"),
+            decision("click", "#login"),
+            decision("click", "#maybe", confidence=0.3),
+        ]
+        with open(os.path.join(tmp_path, "flight_record.json"), "w") as f:
+            json.dump({"metadata": {}, "entries": entries}, f)
+        return SessionReplayer(str(tmp_path), use_cache=False)
+
+    @pytest.fixture
+    def executed(self, monkeypatch):
+        from sentinel.layers.action import ActionExecutor
+
+        calls = []
+        monkeypatch.setattr(ActionExecutor, "execute", lambda self, d: calls.append(d.target) or True)
+        return calls
+
+    def test_default_replays_one_by_one(self, replayer, executed):
+        """Test batching is off unless batch_size is raised."""
+        from unittest.mock import MagicMock
+
+        driver = MagicMock()
+        results = replayer.replay_on_browser(driver)
+
+        assert executed == ["#user", "#pass", "#login", "#maybe"]
+        driver.execute_script.assert_not_called()
+        assert all(ok for _, ok in results)
+
+    def test_consecutive_decisions_share_one_script(self, replayer, executed):
+        """Test confident click/type runs are batched and low confidence is not."""
+        from unittest.mock import MagicMock
+
+        driver = MagicMock()
+        driver.execute_script.return_value = 3
+        results = replayer.replay_on_browser(driver, batch_size=5)
+
+        payload = driver.execute_script.call_args[0][1]
+        assert [a["target"] for a in payload] == ["#user", "#pass", "#login"]
+        assert payload[0]["value"] == "alice"
+        assert executed == ["#maybe"]
+        assert [s.target for s, _ in results] == ["#user", "#pass", "#login", "#maybe"]
+
+    def test_click_ends_batch(self, tmp_path, executed):
+        """Test actions after a (possibly navigating) click go in a new script."""
+        from unittest.mock import MagicMock
+
+        entries = [
+            {"timestamp": "2024-01-02T03:04:05", "event_type": "decision", "message": t,
+             "data": {"action": a, "target": t, "confidence": 0.9, "metadata": {"text": "x"}}}
+            for a, t in [("type", "#q"), ("click", "#search"), ("type", "#filter"), ("click", "#apply")]
+        ]
+        with open(os.path.join(tmp_path, "flight_record.json"), "w") as f:
+            json.dump({"metadata": {}, "entries": entries}, f)
+
+        driver = MagicMock()
+        driver.execute_script.return_value = 2
+        results = SessionReplayer(str(tmp_path), use_cache=False).replay_on_browser(driver, batch_size=5)
+
+        payloads = [c[0][1] for c in driver.execute_script.call_args_list]
+        assert [[a["target"] for a in p] for p in payloads] == [["#q", "#search"], ["#filter", "#apply"]]
+        assert executed == []
+        assert len(results) == 4
+
+    def test_unresolved_batch_step_falls_back(self, replayer, executed):
+        """Test steps after a missing target go through the executor."""
+        from unittest.mock import MagicMock
+
+        driver = MagicMock()
+        driver.execute_script.side_effect = [1, 0]
+        results = replayer.replay_on_browser(driver, batch_size=5)
+
+        assert executed == ["#pass", "#login", "#maybe"]
+        assert len(results) == 4
+
+    def test_iter_replay_is_driven_by_caller(self, replayer, executed):
+        """Test the generator only executes the next step when advanced."""
+        from unittest.mock import MagicMock
+
+        replay = replayer.iter_replay_on_browser(MagicMock())
+        step, ok = next(replay)
+
+        assert (step.target, ok) == ("#user", True)
+        assert executed == ["#user"]
+        assert [s.target for s, _ in replay] == ["#pass", "#login", "#maybe"]
+
+
+class TestStepping:
+    """Test next_step()/reset() navigation."""
+
+    def test_next_step_walks_and_resets(self, report_dir):
+        """Test stepping loads lazily, stops at the end and restarts on reset."""
+        replayer = SessionReplayer(report_dir, use_cache=False)
+
+        messages = []
+        while (step := replayer.next_step()) is not None:
+            messages.append(step.message)
+
+        assert len(messages) == 3
+        assert replayer.next_step() is None
+        replayer.reset()
+        assert replayer.next_step().message == messages[0]
+
+
+class TestSummary:
+    """Test print_summary output."""
+
+    @pytest.mark.parametrize("confidence, filled", [(0.0, 0), (0.55, 5), (1.0, 10), (1.7, 10), (-0.2, 0)])
+    def test_confidence_bar_is_clamped(self, confidence, filled):
+        """Test bars always have ten cells."""
+        bar = session_replayer.confidence_bar(confidence)
+        assert bar == "█" * filled + "░" * (10 - filled)
+
+    def test_summary_lists_decisions(self, tmp_path, capsys):
+        """Test the decision timeline is printed with its bar."""
+        entries = [{"timestamp": "2024-01-02T03:04:05", "event_type": "decision", "message": "m",
+                    "data": {"action": "click", "target": "#go", "confidence": 0.8, "reasoning": "why"}}]
+        with open(os.path.join(tmp_path, "flight_record.json"), "w") as f:
+            json.dump({"metadata": {}, "entries": entries}, f)
+
+        SessionReplayer(str(tmp_path), use_cache=False).print_summary()
+
+        out = capsys.readouterr().out
+        assert "[████████░░] CLICK → #go" in out
+        assert "└─ why..." in out
+
+
+class TestScreenshotValidation:
+    """Test load(validate_screenshots=True)."""
+
+    def test_missing_screenshots_are_flagged(self, tmp_path):
+        """Test only steps whose screenshot file is gone are flagged."""
+        present = tmp_path / "present.png"
+        present.write_bytes(b"")
+        entries = [
+            {"timestamp": "2024-01-02T03:04:05", "event_type": "info", "message": str(i),
+             "data": {}, "screenshot_path": path}
+            for i, path in enumerate([str(present), str(tmp_path / "gone.png"), None])
+        ]
+        with open(os.path.join(tmp_path, "flight_record.json"), "w") as f:
+            json.dump({"metadata": {}, "entries": entries}, f)
+
+        steps = SessionReplayer(str(tmp_path), use_cache=False).load(validate_screenshots=True).steps
+
+        assert [s.screenshot_missing for s in steps] == [False, True, False]
+
+
+class TestEpochTimestamps:
+    """Test steps store epoch floats and expose datetimes on demand."""
+
+    def test_duration_from_epoch_floats(self, tmp_path):
+        """Test duration is the difference of the first and last step times."""
+        entries = [
+            {"timestamp": ts, "event_type": "info", "message": "m", "data": {}}
+            for ts in ["2024-01-02T03:04:05", "2024-01-02T03:04:07.500000"]
+        ]
+        with open(os.path.join(tmp_path, "flight_record.json"), "w") as f:
+            json.dump({"metadata": {}, "entries": entries}, f)
+
+        session = SessionReplayer(str(tmp_path), use_cache=False).load()
+
+        assert isinstance(session.steps[0].timestamp_s, float)
+        assert session.duration_seconds == pytest.approx(2.5)
+        assert session.steps[0].timestamp.isoformat() == "2024-01-02T03:04:05"
+        assert session.end_time.isoformat() == "2024-01-02T03:04:07.500000"
+
+
+class TestConfidenceAnalytics:
+    """Test the confidence aggregation helpers."""
+
+    def test_histogram_bins_and_clamps(self):
+        """Test scores land in equal-width bins with out-of-range values clamped."""
+        counts = session_replayer.confidence_histogram([0.0, 0.05, 0.5, 0.99, 1.0, 1.4, -0.1], nbins=4)
+        assert counts == [3, 0, 1, 3]
+
+    def test_rolling_mean_uses_full_windows(self):
+        """Test one mean is produced per complete window."""
+        means = session_replayer.rolling_mean([1.0, 2.0, 3.0, 4.0, 5.0], 3)
+        assert means == pytest.approx([2.0, 3.0, 4.0])
+        assert session_replayer.rolling_mean([1.0], 3) == []
+        with pytest.raises(ValueError):
+            session_replayer.rolling_mean([1.0], 0)
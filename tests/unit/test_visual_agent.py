@@ -4,11 +4,12 @@ Unit tests for VisualAgent.
 Tests the VLM integration with mock backend to avoid model downloads during CI.
 """
 
+import sys
+
 import pytest
-from unittest.mock import MagicMock, patch
-import os
-import tempfile
+from unittest.mock import MagicMock
 
+from sentinel.core import disk_cache
 from sentinel.layers.sense.visual_agent import VisualAgent, VisualElement
 
 
@@ -20,76 +21,44 @@ class TestVisualAgentMock:
         agent = VisualAgent(backend="mock")
         assert agent.backend == "mock"
     
-    def test_describe_state_mock(self):
-        """Test describe_state returns a description."""
-        agent = VisualAgent(backend="mock")
-        
-        # Create a temp file to simulate a screenshot
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(b"fake image data")
-            temp_path = f.name
-        
-        try:
-            description = agent.describe_state(temp_path)
-            assert "Login button" in description or "button" in description.lower()
-            assert len(description) > 20
-        finally:
-            os.unlink(temp_path)
-    
-    def test_describe_state_missing_file(self):
+    def test_describe_state_missing_file(self, mock_agent):
         """Test describe_state handles missing files."""
-        agent = VisualAgent(backend="mock")
-        description = agent.describe_state("/nonexistent/path.png")
+        description = mock_agent.describe_state("/nonexistent/path.png")
         assert "Error" in description
     
-    def test_find_element_mock(self):
-        """Test find_element returns coordinates."""
-        agent = VisualAgent(backend="mock")
-        
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(b"fake image data")
-            temp_path = f.name
-        
-        try:
-            element = agent.find_element(temp_path, "login button")
-            assert element is not None
-            assert isinstance(element, VisualElement)
-            assert element.x >= 0
-            assert element.y >= 0
-            assert element.confidence > 0
-        finally:
-            os.unlink(temp_path)
-    
-    def test_verify_action_mock(self):
-        """Test verify_action returns confidence score."""
-        agent = VisualAgent(backend="mock")
-        
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(b"fake image data")
-            before_path = f.name
-            
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(b"fake image data 2")
-            after_path = f.name
-        
-        try:
-            confidence = agent.verify_action(before_path, after_path, "clicked the button")
-            assert 0.0 <= confidence <= 1.0
-        finally:
-            os.unlink(before_path)
-            os.unlink(after_path)
+    @pytest.mark.parametrize("op, check", [
+        pytest.param(
+            lambda agent, path: agent.describe_state(path),
+            lambda r: "button" in r.lower() and len(r) > 20,
+            id="describe_state",
+        ),
+        pytest.param(
+            lambda agent, path: agent.find_element(path, "login button"),
+            lambda r: isinstance(r, VisualElement) and r.x >= 0 and r.y >= 0 and r.confidence > 0,
+            id="find_element",
+        ),
+        pytest.param(
+            # The mock never compares the images, so one file serves as both
+            lambda agent, path: agent.verify_action(path, path, "clicked the button"),
+            lambda r: 0.0 <= r <= 1.0,
+            id="verify_action",
+        ),
+    ])
+    def test_mock_operations(self, mock_agent, fake_png, op, check):
+        """Test describe/find/verify return well-formed results on screenshots."""
+        assert check(op(mock_agent, fake_png))
 
 
 class TestVisualAgentAutoDetect:
     """Test auto-detection of backend."""
     
-    def test_auto_detect_falls_back_to_moondream(self):
+    def test_auto_detect_falls_back_to_moondream(self, monkeypatch):
         """Test that auto detection finds a backend."""
         # Clear OpenAI key to force non-openai detection
-        with patch.dict(os.environ, {"OPENAI_API_KEY": ""}, clear=False):
-            agent = VisualAgent(backend="auto")
-            # Should fall back to moondream or mock
-            assert agent.backend in ["moondream", "mock"]
+        monkeypatch.setenv("OPENAI_API_KEY", "")
+        agent = VisualAgent(backend="auto")
+        # Should fall back to moondream or mock
+        assert agent.backend in ["moondream", "mock"]
 
 
 class TestVisualElement:
@@ -103,6 +72,291 @@ class TestVisualElement:
             width=80, height=30,
             confidence=0.95
         )
-        assert elem.description == "login button"
-        assert elem.x == 100
-        assert elem.confidence == 0.95
+        assert (elem.description, elem.x, elem.y, elem.width, elem.height, elem.confidence) == (
+            "login button", 100, 200, 80, 30, 0.95
+        )
+
+
+class TestVisualAgentQuantization:
+    """Test quantization option handling (no model download)."""
+
+    def test_rejects_unknown_mode(self):
+        """Test unknown quantization modes fail fast."""
+        with pytest.raises(ValueError):
+            VisualAgent(backend="mock", quantization="int2")
+
+    @pytest.mark.parametrize("mode, dtype", [("fp16", "float16"), ("bf16", "bfloat16")])
+    def test_cpu_half_precision_is_honored(self, mode, dtype):
+        """Test fp16 and bf16 on CPU load exactly the requested dtype."""
+        torch = pytest.importorskip("torch")
+        agent = VisualAgent(backend="mock", quantization=mode)
+        agent._device = "cpu"
+        assert agent._moondream_load_kwargs(torch) == {"torch_dtype": getattr(torch, dtype)}
+
+    def test_int8_on_cpu_falls_back(self):
+        """Test int8 without CUDA loads the default CPU dtype."""
+        torch = pytest.importorskip("torch")
+        agent = VisualAgent(backend="mock", quantization="int8")
+        agent._device = "cpu"
+        assert agent._moondream_load_kwargs(torch) == {"torch_dtype": torch.float32}
+
+
+class TestVisualAgentCompile:
+    """Test torch.compile wiring with a stand-in torch and Moondream model."""
+
+    def test_answer_question_runs_compiled_steps(self):
+        """Test the steps answer_question calls are the compiled callables."""
+        pytest.importorskip("PIL.Image")
+
+        class Inner:
+            def _vis_enc(self, image):
+                return "enc"
+
+            def _prefill(self, prompt):
+                return "prefill"
+
+            def _decode_one_tokens(self, token):
+                return "token"
+
+        class Model:
+            def __init__(self):
+                self.model = Inner()
+
+            def encode_image(self, image):
+                return self.model._vis_enc(image)
+
+            def answer_question(self, enc_image, question, tokenizer):
+                self.model._prefill(question)
+                return self.model._decode_one_tokens(0)
+
+        compiled = []
+
+        def fake_compile(fn, **kwargs):
+            def wrapper(*args):
+                compiled.append(fn.__name__)
+                return fn(*args)
+            return wrapper
+
+        torch = MagicMock(compile=MagicMock(side_effect=fake_compile))
+        agent = VisualAgent(backend="mock")
+        agent._model = Model()
+
+        agent._compile_moondream(torch)
+        compiled.clear()
+        assert agent._model.answer_question("enc", "q", None) == "token"
+
+        assert compiled == ["_prefill", "_decode_one_tokens"]
+        modes = {c.args[0].__name__: c.kwargs.get("mode") for c in torch.compile.call_args_list}
+        assert modes == {"_vis_enc": None, "_prefill": None, "_decode_one_tokens": "reduce-overhead"}
+
+    def test_failed_warmup_restores_eager_steps(self):
+        """Test a compile failure during warmup leaves the eager methods in place."""
+        pytest.importorskip("PIL.Image")
+        inner = MagicMock(spec=["_decode_one_tokens"])
+        eager = inner._decode_one_tokens
+        model = MagicMock(model=inner)
+        model.answer_question.side_effect = RuntimeError("inductor")
+
+        agent = VisualAgent(backend="mock")
+        agent._model = model
+        agent._compile_moondream(MagicMock())
+
+        assert inner._decode_one_tokens is eager
+
+
+class TestVisualAgentEncodingCache:
+    """Test the Moondream image-encoding cache."""
+
+    def test_repeat_queries_encode_once(self, tmp_path):
+        """Test the same unchanged screenshot is only encoded once."""
+        Image = pytest.importorskip("PIL.Image")
+        path = tmp_path / "shot.png"
+        Image.new("RGB", (8, 8)).save(path)
+
+        agent = VisualAgent(backend="mock")
+        agent.backend = "moondream"
+        agent._model = MagicMock()
+        agent._model.answer_question.return_value = "ok"
+
+        agent._moondream_query(str(path), "first")
+        agent._moondream_query(str(path), "second")
+
+        assert agent._model.encode_image.call_count == 1
+        assert agent._model.answer_question.call_count == 2
+
+
+class TestVisualAgentImageIO:
+    """Test raw image reading for API backends."""
+
+    def test_read_base64_matches_file(self, tmp_path):
+        """Test memory-mapped base64 matches a plain read, including empty files."""
+        import base64
+
+        path = tmp_path / "shot.png"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(range(256)))
+        assert VisualAgent._read_base64(str(path)) == base64.b64encode(path.read_bytes()).decode()
+
+        empty = tmp_path / "empty.png"
+        empty.write_bytes(b"")
+        assert VisualAgent._read_base64(str(empty)) == ""
+
+
+class TestElementResponseParsing:
+    """Test keyword-based position parsing."""
+
+    @pytest.mark.parametrize("response,expected", [
+        ("It is at the TOP right of the page", (700, 100)),
+        ("bottom left corner", (100, 600)),
+        ("in the center", (400, 350)),
+        ("somewhere in the middleft", (100, 350)),
+        ("not sure", (400, 300)),
+    ])
+    def test_position_keywords(self, response, expected):
+        """Test keywords map to the same coordinates as before."""
+        agent = VisualAgent(backend="mock")
+        element = agent._parse_element_response(response, "button")
+        assert (element.x, element.y) == expected
+
+
+class TestVerifyActionOpenAI:
+    """Test verify_action orchestration on the openai backend (API mocked)."""
+
+    def test_describes_both_then_compares(self, tmp_path):
+        """Test both screenshots are described before the comparison query."""
+        before = tmp_path / "before.png"
+        after = tmp_path / "after.png"
+        before.write_bytes(b"before")
+        after.write_bytes(b"after")
+
+        agent = VisualAgent(backend="mock")
+        agent.backend = "openai"
+        answers = {str(before): "login form", str(after): "dashboard"}
+        agent._openai_query = MagicMock(
+            side_effect=lambda path, prompt: "90" if "Compare" in prompt else answers[path]
+        )
+
+        assert agent.verify_action(str(before), str(after), "log in") == 0.9
+        compare_prompt = agent._openai_query.call_args_list[-1][0][1]
+        assert "BEFORE: login form" in compare_prompt
+        assert "AFTER: dashboard" in compare_prompt
+
+
+class TestOpenAIClient:
+    """Test the shared OpenAI client (openai module mocked)."""
+
+    def test_queries_reuse_one_client(self, tmp_path, monkeypatch):
+        """Test repeated queries go through the client created by the helper."""
+        path = tmp_path / "shot.png"
+        path.write_bytes(b"png")
+        fake_openai = MagicMock()
+        client = fake_openai.OpenAI.return_value
+        client.chat.completions.create.return_value.choices = [
+            MagicMock(message=MagicMock(content="a page"))
+        ]
+        monkeypatch.setitem(sys.modules, "openai", fake_openai)
+
+        agent = VisualAgent(backend="mock")
+        agent.backend = "openai"
+        agent._prepare_image = lambda p: p
+
+        assert agent._openai_query(str(path), "what?") == "a page"
+        assert agent._openai_query(str(path), "again?") == "a page"
+        fake_openai.OpenAI.assert_called_once_with()
+        assert client.chat.completions.create.call_count == 2
+
+    def test_unavailable_client_returns_error(self, monkeypatch):
+        """Test a client that cannot be created yields an error string."""
+        fake_openai = MagicMock()
+        fake_openai.OpenAI.side_effect = RuntimeError("no key")
+        monkeypatch.setitem(sys.modules, "openai", fake_openai)
+
+        agent = VisualAgent(backend="mock")
+        agent.backend = "openai"
+
+        assert agent._openai_query("/unused.png", "what?").startswith("Error")
+
+
+class TestVerifyActionHashFastPath:
+    """Test the perceptual-hash shortcut in verify_action."""
+
+    def _agent(self):
+        agent = VisualAgent(backend="mock")
+        agent.backend = "openai"
+        agent._openai_query = MagicMock(return_value="80")
+        return agent
+
+    def test_identical_screens_skip_vlm(self, tmp_path):
+        """Test unchanged screenshots return 0.0 without any VLM call."""
+        Image = pytest.importorskip("PIL.Image")
+        for name in ("a.png", "b.png"):
+            Image.new("RGB", (64, 64), "white").save(tmp_path / name)
+
+        agent = self._agent()
+        assert agent.verify_action(str(tmp_path / "a.png"), str(tmp_path / "b.png"), "click") == 0.0
+        agent._openai_query.assert_not_called()
+
+    def test_very_different_screens_use_one_query(self, tmp_path):
+        """Test a large hash distance asks the VLM once instead of three times."""
+        Image = pytest.importorskip("PIL.Image")
+        before = Image.new("L", (90, 80))
+        before.putdata([(x * 25) % 256 for y in range(80) for x in range(90)])
+        after = before.transpose(Image.FLIP_LEFT_RIGHT)
+        before.save(tmp_path / "a.png")
+        after.save(tmp_path / "b.png")
+
+        agent = self._agent()
+        assert agent.verify_action(str(tmp_path / "a.png"), str(tmp_path / "b.png"), "click") == 0.8
+        assert agent._openai_query.call_count == 1
+
+
+class TestPrepareImage:
+    """Test screenshot downscaling for uploads."""
+
+    @pytest.fixture(autouse=True)
+    def _cache_dir(self, tmp_path, monkeypatch):
+        cache_root = tmp_path / "cache_root"
+        cache_root.mkdir()
+        monkeypatch.setattr(disk_cache.tempfile, "gettempdir", lambda: str(cache_root))
+        return cache_root
+
+    def test_downscales_and_caches(self, tmp_path, _cache_dir):
+        """Test a large screenshot becomes a cached JPEG within MAX_IMAGE_DIM."""
+        Image = pytest.importorskip("PIL.Image")
+        path = tmp_path / "big.png"
+        Image.new("RGB", (1920, 1080), "white").save(path)
+
+        agent = VisualAgent(backend="mock")
+        prepared = agent._prepare_image(str(path))
+
+        assert prepared.endswith(".jpg")
+        assert prepared.startswith(str(_cache_dir))
+        with Image.open(prepared) as image:
+            assert max(image.size) == agent.MAX_IMAGE_DIM
+        assert agent._prepare_image(str(path)) == prepared
+
+    def test_unreadable_image_falls_back(self, tmp_path):
+        """Test files Pillow cannot read are sent as-is."""
+        path = tmp_path / "broken.png"
+        path.write_bytes(b"not an image")
+        agent = VisualAgent(backend="mock")
+        assert agent._prepare_image(str(path)) == str(path)
+
+
+class TestVerifyActionsBatch:
+    """Test batch verification."""
+
+    def test_results_keep_order(self, tmp_path):
+        """Test each triple gets its own score, in order."""
+        paths = []
+        for name in ("a.png", "b.png", "c.png"):
+            path = tmp_path / name
+            path.write_bytes(name.encode())
+            paths.append(str(path))
+
+        agent = VisualAgent(backend="mock")
+        scores = agent.verify_actions_batch([
+            (paths[0], paths[1], "click"),
+            (paths[1], str(tmp_path / "missing.png"), "type"),
+            (paths[1], paths[2], "submit"),
+        ])
+        assert scores == [0.85, 0.0, 0.85]
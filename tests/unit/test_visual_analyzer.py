@@ -0,0 +1,77 @@
+"""
+Unit tests for VisualAnalyzer.
+
+The browser is mocked; these tests cover how probe results are dispatched.
+"""
+
+from unittest.mock import MagicMock
+
+from sentinel.layers.sense.visual_analyzer import VisualAnalyzer
+
+
+def _analyzer(probe):
+    driver = MagicMock()
+    driver.execute_script.return_value = probe
+    driver.find_elements.return_value = []
+    analyzer = VisualAnalyzer(driver)
+    return analyzer, driver
+
+
+class TestBlockedState:
+    """Test is_blocked() on top of the combined probe."""
+
+    def test_ready_page_uses_one_round_trip(self):
+        """Test a clear page is reported ready after a single script call."""
+        analyzer, driver = _analyzer({"readyState": "complete", "jqueryActive": 0})
+        assert analyzer.is_blocked() == (False, "Ready")
+        assert driver.execute_script.call_count == 1
+
+    def test_overlay_takes_priority(self):
+        """Test overlays are reported before spinners."""
+        analyzer, _ = _analyzer({
+            "overlay": "Modal overlay: .modal",
+            "spinner": "Spinner: .loader",
+            "readyState": "complete",
+        })
+        assert analyzer.is_blocked() == (True, "Modal overlay: .modal")
+
+    def test_pending_ajax_blocks(self):
+        """Test active jQuery requests count as still loading."""
+        analyzer, _ = _analyzer({"readyState": "complete", "jqueryActive": 2})
+        assert analyzer.is_blocked() == (True, "Page still loading")
+
+    def test_probe_failure_is_not_blocking(self):
+        """Test a failing script is treated as ready, like the old checks."""
+        analyzer, driver = _analyzer(None)
+        driver.execute_script.side_effect = Exception("no session")
+        assert analyzer.is_blocked() == (False, "Ready")
+
+
+def test_visual_state_reports_spinner():
+    """Test get_visual_state() fills flags from the probe."""
+    analyzer, _ = _analyzer({"spinner": "Spinner: .loader", "readyState": "loading"})
+    state = analyzer.get_visual_state()
+    assert state.is_blocked and state.has_spinner and not state.has_overlay
+    assert state.reason == "Spinner: .loader"
+    assert state.page_ready is False
+
+
+def test_probe_is_injected_when_missing():
+    """Test the probe is installed on demand when the page lacks it."""
+    analyzer, driver = _analyzer(None)
+    driver.execute_script.side_effect = [None, None, {"readyState": "complete"}]
+
+    assert analyzer.is_blocked() == (False, "Ready")
+    installer = driver.execute_script.call_args_list[1][0][0]
+    assert "window.__sentinelProbe" in installer
+    assert '".modal"' in installer
+
+
+def test_error_check_rides_on_the_probe():
+    """Test visible errors come back from the probe without extra WebDriver calls."""
+    analyzer, driver = _analyzer({"readyState": "complete", "error": "[role='alert']"})
+
+    assert analyzer.get_visual_state().has_error is True
+    assert driver.execute_script.call_count == 1
+    assert driver.execute_script.call_args[0][1:] == (False, True)
+    driver.find_elements.assert_not_called()